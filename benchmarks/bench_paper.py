@@ -0,0 +1,108 @@
+"""
+Paper generation benchmark: generate_paper() against ORDER BY RANDOM() as the bank grows.
+
+Builds scratch banks of increasing size (three subjects, difficulties 1-3, a share of the
+ids deleted so the id ranges have gaps), then times generating a paper of --per-subject
+questions per subject with and without difficulty weighting, next to the
+`ORDER BY RANDOM() LIMIT n` query per subject it replaces.
+
+Usage (from the repository root):
+    python benchmarks/bench_paper.py
+    python benchmarks/bench_paper.py --sizes 10000 100000 500000 --per-subject 30
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask_migrate import upgrade
+from quiz_app import create_app, init_migrations
+from quiz_app.extensions import db
+from quiz_app.models import Question, bump_bank_version, next_change_seq
+from quiz_app.papers import generate_paper, paper_strata, parse_paper_spec
+
+SUBJECTS = ['Physics', 'Chemistry', 'Mathematics']
+
+
+def build_bank(size, holes):
+    """Inserts size questions spread over SUBJECTS, then deletes a random share of them."""
+    rng = random.Random(size)
+    change_seq = next_change_seq()
+    batch = []
+    for i in range(size):
+        batch.append({
+            'question_text': f'Question {i}', 'option1': 'a', 'option2': 'b', 'option3': 'c', 'option4': 'd',
+            'correct_answer': i % 4, 'subject': SUBJECTS[rng.randrange(len(SUBJECTS))],
+            'difficulty': rng.choice((1, 1, 2, 2, 2, 3)), 'topic': None, 'change_seq': change_seq
+        })
+        if len(batch) == 10000:
+            db.session.execute(db.insert(Question), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Question), batch)
+    deleted = rng.sample(range(1, size + 1), int(size * holes))
+    for start in range(0, len(deleted), 500):
+        db.session.execute(db.delete(Question).where(Question.id.in_(deleted[start:start + 500])))
+    bump_bank_version(*SUBJECTS)
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--per-subject', type=int, default=30)
+    parser.add_argument('--holes', type=float, default=0.3, help='share of ids deleted')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        scratch = tempfile.mkdtemp(prefix='bench_paper_')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(scratch, 'bank.db')})
+        init_migrations(app)
+        try:
+            with app.app_context():
+                upgrade()
+                build_bank(size, args.holes)
+                plain, _ = parse_paper_spec({'per_subject': args.per_subject})
+                weighted, _ = parse_paper_spec({'per_subject': args.per_subject, 'weight_by': 'difficulty',
+                                                'weights': {'easy': 1, 'medium': 2, 'hard': 1}})
+                paper_strata.clear() # Each scratch bank starts at the same subject versions
+                generate_paper(SUBJECTS, plain, 0) # Builds the cached strata once, as a running server would
+                seeds = iter(range(1, 10 ** 6))
+                results = {
+                    'generate_paper': timed(lambda: generate_paper(SUBJECTS, plain, next(seeds)), args.repeat),
+                    'generate_paper (by difficulty)': timed(
+                        lambda: generate_paper(SUBJECTS, weighted, next(seeds)), args.repeat),
+                    'ORDER BY RANDOM()': timed(lambda: [
+                        db.session.execute(db.select(Question.id).where(Question.subject == subject)
+                                           .order_by(db.func.random()).limit(args.per_subject)).all()
+                        for subject in SUBJECTS], args.repeat)
+                }
+                db.session.remove()
+            print(f'{size} questions ({int(size * (1 - args.holes))} after deletes):')
+            for name, ms in results.items():
+                print(f'  {name:32s} {ms:9.2f} ms')
+        finally:
+            with app.app_context():
+                db.engine.dispose()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
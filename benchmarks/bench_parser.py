@@ -0,0 +1,57 @@
+"""
+Question parser throughput benchmark.
+
+Extracts the text of each PDF once, then repeatedly runs process_pdf_content on it
+and reports how many questions per second the tokenizer parses.
+
+Usage (from the repository root):
+    python benchmarks/bench_parser.py
+    python benchmarks/bench_parser.py --repeat 500 static/neet.pdf
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from quiz_app import create_app
+from quiz_app.parsing import ParseReport, process_pdf_content
+from quiz_app.pdf import iter_pdf_pages
+
+DEFAULT_PDFS = [os.path.join(ROOT, 'static', 'comp12.pdf'), os.path.join(ROOT, 'static', 'neet.pdf')]
+
+
+def bench(path, repeat):
+    text = ''.join(iter_pdf_pages(path))
+    report = ParseReport()
+    parsed = len(process_pdf_content(text, report=report))
+    chunks = parsed + len(report.skipped)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        process_pdf_content(text)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    print(f"{os.path.basename(path)}: {len(text)} chars, {chunks} question chunks, "
+          f"{parsed} parsed, skipped {report.reason_counts()}")
+    print(f"  {elapsed * 1000:.3f} ms per document, "
+          f"{parsed / elapsed:,.0f} questions/s parsed, {chunks / elapsed:,.0f} chunks/s scanned")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pdfs', nargs='*', default=DEFAULT_PDFS)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    # Extraction is not what is measured here; keep it in-process.
+    app = create_app({'PDF_EXTRACT_WORKERS': 1})
+    with app.app_context():
+        for path in args.pdfs:
+            bench(path, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
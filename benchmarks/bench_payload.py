@@ -0,0 +1,116 @@
+"""
+Payload benchmark: /api/questions pages as JSON and as qpack.
+
+Fetches pages of the question bank (a scratch copy of instance/users.db) in both formats,
+reports their size uncompressed, gzipped and brotli-compressed, and, if Node.js is on the
+PATH, the time a browser-like client takes to turn the bytes into question objects:
+TextDecoder + JSON.parse for JSON, decodeQuestionPack() from static/js/qpack.js for qpack.
+
+Usage (from the repository root):
+    python benchmarks/bench_payload.py
+    python benchmarks/bench_payload.py --limits 100 500 --iterations 2000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCRATCH = tempfile.mkdtemp(prefix='bench_payload_')
+shutil.copy(os.path.join(ROOT, 'instance', 'users.db'), os.path.join(SCRATCH, 'users.db'))
+
+from flask_migrate import upgrade
+from quiz_app import create_app, init_migrations
+from quiz_app.qpack import MIMETYPE
+from quiz_app.question_bank import brotli, compress_body
+
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(SCRATCH, 'users.db')})
+init_migrations(app)
+
+# Decodes each payload file `iterations` times and prints the median time per decode in ms.
+NODE_SCRIPT = r"""
+const fs = require('fs');
+const { decodeQuestionPack } = require(process.argv[1]);
+const [jsonFile, qpackFile, iterations] = [process.argv[2], process.argv[3], Number(process.argv[4])];
+const decoders = {
+  json: bytes => JSON.parse(new TextDecoder().decode(bytes)),
+  qpack: bytes => decodeQuestionPack(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength)),
+};
+const files = { json: fs.readFileSync(jsonFile), qpack: fs.readFileSync(qpackFile) };
+const decoded = {};
+const result = {};
+for (const name of ['json', 'qpack']) {
+  const bytes = new Uint8Array(files[name]);
+  for (let i = 0; i < 200; i++) decoders[name](bytes); // Warm up the JIT
+  const times = [];
+  for (let i = 0; i < iterations; i++) {
+    const start = process.hrtime.bigint();
+    decoded[name] = decoders[name](bytes);
+    times.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  times.sort((a, b) => a - b);
+  result[name] = times[Math.floor(times.length / 2)];
+}
+result.identical = JSON.stringify(decoded.json) === JSON.stringify(decoded.qpack);
+console.log(JSON.stringify(result));
+"""
+
+
+def fetch(client, limit, accept):
+    response = client.get(f'/api/questions?limit={limit}', headers={'Accept': accept, 'Accept-Encoding': 'identity'})
+    assert response.status_code == 200, response.status_code
+    return response.data
+
+
+def parse_times(json_body, qpack_body, iterations):
+    """Median decode times in Node.js, or None if node is not installed."""
+    node = shutil.which('node')
+    if node is None:
+        return None
+    paths = []
+    for name, body in (('page.json', json_body), ('page.qpack', qpack_body)):
+        paths.append(os.path.join(SCRATCH, name))
+        with open(paths[-1], 'wb') as f:
+            f.write(body)
+    output = subprocess.run([node, '-e', NODE_SCRIPT, os.path.join(ROOT, 'static', 'js', 'qpack.js'),
+                             *paths, str(iterations)], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--limits', type=int, nargs='+', default=[100, 500])
+    parser.add_argument('--iterations', type=int, default=1000, help='decodes timed per payload')
+    args = parser.parse_args()
+
+    with app.app_context():
+        upgrade() # The copy may predate the current schema
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = 'bench'
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+    try:
+        for limit in args.limits:
+            bodies = {'json': fetch(client, limit, 'application/json'), 'qpack': fetch(client, limit, MIMETYPE)}
+            questions = len(json.loads(bodies['json'])['questions'])
+            print(f'Page of {questions} questions (limit={limit}):')
+            for fmt, body in bodies.items():
+                sizes = ', '.join(f'{encoding} {len(compress_body(body, encoding)):>7,} B' for encoding in encodings)
+                print(f'  {fmt:6s} {sizes}')
+            times = parse_times(bodies['json'], bodies['qpack'], args.iterations)
+            if times is None:
+                print('  parse time: skipped, node is not installed')
+            else:
+                print(f"  parse time (Node.js, median): json {times['json']:.3f} ms, qpack {times['qpack']:.3f} ms, "
+                      f"same questions: {times['identical']}")
+    finally:
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Read path benchmark: serializing questions through ORM instances against the Core read model.
+
+Builds scratch banks of increasing size, then reads every question in the shape served by
+/api/questions two ways: `Question.query.all()` with the fields copied out of each instance
+(the previous path), and read_model's column-projected tuples streamed in batches. Each path is
+measured for the rows alone and for a full SubjectSnapshot (rows plus their JSON items), as
+rows per second (median of --repeat runs) and peak Python memory (tracemalloc, one run).
+
+Usage (from the repository root):
+    python benchmarks/bench_read_model.py
+    python benchmarks/bench_read_model.py --sizes 10000 100000 500000 --repeat 3
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask_migrate import upgrade
+from quiz_app import create_app, init_migrations
+from quiz_app.extensions import db
+from quiz_app.models import Question
+from quiz_app.question_bank import SubjectSnapshot
+from quiz_app.read_model import iter_question_rows, select_questions
+
+
+def build_bank(size):
+    batch = []
+    for i in range(size):
+        batch.append({
+            'question_text': f'Question {i}: which of the following holds for the system described?',
+            'option1': f'Option A {i}', 'option2': f'Option B {i}', 'option3': f'Option C {i}',
+            'option4': f'Option D {i}', 'correct_answer': i % 4, 'subject': 'Physics',
+            'difficulty': 1 + i % 3, 'topic': 'Mechanics', 'change_seq': 1
+        })
+        if len(batch) == 10000:
+            db.session.execute(db.insert(Question), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Question), batch)
+    db.session.commit()
+
+
+def orm_rows():
+    """The ORM path: full Question instances, fields copied into dicts."""
+    return [{
+        'id': q.id,
+        'q': q.question_text,
+        'options': [q.option1, q.option2, q.option3, q.option4],
+        'subject': q.subject
+    } for q in Question.query.order_by(Question.id).all()]
+
+
+def orm_snapshot():
+    rows = orm_rows()
+    items = [json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8') for row in rows]
+    return rows, items
+
+
+def core_rows():
+    return list(iter_question_rows(select_questions().order_by(Question.id)))
+
+
+def core_snapshot():
+    return SubjectSnapshot(1, iter_question_rows(select_questions().order_by(Question.id)))
+
+
+def run(fn):
+    """Runs fn with a fresh session, as a request would, and returns its elapsed time in seconds."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    del result
+    db.session.remove()
+    return elapsed
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    db.session.remove()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = {'ORM rows': orm_rows, 'Core rows': core_rows,
+             'ORM snapshot': orm_snapshot, 'Core snapshot': core_snapshot}
+    for size in args.sizes:
+        scratch = tempfile.mkdtemp(prefix='bench_read_model_')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(scratch, 'bank.db')})
+        init_migrations(app)
+        try:
+            with app.app_context():
+                upgrade()
+                build_bank(size)
+                print(f'{size} questions:')
+                for name, fn in paths.items():
+                    seconds = statistics.median(run(fn) for _ in range(args.repeat))
+                    peak = peak_memory(fn)
+                    print(f'  {name:14s} {size / seconds:12,.0f} rows/s {seconds * 1000:9.1f} ms'
+                          f'   peak {peak / 2 ** 20:8.1f} MiB')
+        finally:
+            with app.app_context():
+                db.engine.dispose()
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+SQLite concurrency benchmark: /api/questions read throughput during admin edits.
+
+Runs reader threads fetching question pages while one writer thread keeps editing
+questions through /edit_question (each edit bumps the bank version, so readers also
+have to reload from the database). The run is repeated with the rollback journal
+(SQLite's defaults) and with the tuned SQLITE_PRAGMAS, on a scratch copy of
+instance/users.db.
+
+Usage (from the repository root):
+    python benchmarks/bench_sqlite_concurrency.py
+    python benchmarks/bench_sqlite_concurrency.py --readers 16 --duration 10
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCRATCH = tempfile.mkdtemp(prefix='bench_sqlite_')
+shutil.copy(os.path.join(ROOT, 'instance', 'users.db'), os.path.join(SCRATCH, 'users.db'))
+
+from flask_migrate import upgrade
+from quiz_app import create_app, init_migrations
+from quiz_app.extensions import db
+from quiz_app.models import Question, User
+
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(SCRATCH, 'users.db')})
+init_migrations(app)
+
+# SQLite's defaults apart from the journal mode, which persists in the file and must be reset.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+MODES = {'default': DEFAULT_PRAGMAS, 'tuned': dict(app.config['SQLITE_PRAGMAS'])}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def reader(username, subjects, stop, latencies, errors):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = username
+    i = 0
+    while not stop.is_set():
+        subject = subjects[i % len(subjects)]
+        i += 1
+        start = time.perf_counter()
+        response = client.get(f'/api/questions?subject={subject}&limit=100')
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+def writer(questions, stop, edits, errors):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['username'] = 'admin'
+    i = 0
+    while not stop.is_set():
+        q = questions[i % len(questions)]
+        i += 1
+        response = client.post(f'/edit_question/{q.id}', data={
+            'question': q.question_text + (' ' if i % 2 else ''),
+            'option1': q.option1, 'option2': q.option2, 'option3': q.option3, 'option4': q.option4,
+            'correct': str(q.correct_answer), 'subject': q.subject
+        })
+        if response.status_code == 302:
+            edits.append(1)
+        else:
+            errors.append(response.status_code)
+
+
+def run(mode, readers, duration, username, subjects, questions):
+    app.config['SQLITE_PRAGMAS'] = MODES[mode]
+    with app.app_context():
+        db.engine.dispose() # New connections pick up the pragmas
+
+    stop = threading.Event()
+    latencies, edits, read_errors, write_errors = [], [], [], []
+    threads = [threading.Thread(target=reader, args=(username, subjects, stop, latencies, read_errors))
+               for _ in range(readers)]
+    threads.append(threading.Thread(target=writer, args=(questions, stop, edits, write_errors)))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"{mode:>8}: {len(latencies) / duration:8.1f} reads/s  "
+          f"p50 {percentile(latencies, 0.5) * 1000:6.2f} ms  p95 {percentile(latencies, 0.95) * 1000:6.2f} ms  "
+          f"{len(edits) / duration:6.1f} edits/s  errors {len(read_errors)} reads / {len(write_errors)} edits")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per mode')
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=['default', 'tuned'])
+    args = parser.parse_args()
+
+    with app.app_context():
+        upgrade() # The copy may predate the current schema
+        username = User.query.filter(User.username != 'admin').first().username
+        subjects = [s for (s,) in db.session.query(Question.subject).distinct()]
+        questions = Question.query.limit(20).all()
+        db.session.expunge_all()
+
+    try:
+        for mode in args.modes:
+            run(mode, args.readers, args.duration, username, subjects, questions)
+    finally:
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
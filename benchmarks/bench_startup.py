@@ -0,0 +1,72 @@
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import the app.
+
+Each run starts a new `python -X importtime -c "import controller"` process (what every
+pre-forked worker, `flask` CLI call and PDF extraction process pays), reports the
+wall-clock time and the import time spent per top-level package. PyMuPDF is imported
+lazily by the ingest path, so it should not show up; its own import cost is measured
+separately for comparison.
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 20 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_once(statement):
+    """
+    Runs statement in a fresh interpreter. Returns (wall seconds, {top-level package: self us summed
+    over its modules}, names of all modules imported).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+
+    packages, imported = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        imported.add(name)
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return elapsed, packages, imported
+
+
+def bench(statement, repeat, top):
+    runs = [import_once(statement) for _ in range(repeat)]
+    walls = sorted(run[0] for run in runs)
+    # Per-module figures from the fastest run, the one least disturbed by other processes
+    _, modules, imported = min(runs, key=lambda run: run[0])
+    print(f"{statement!r}: median {statistics.median(walls) * 1000:.1f} ms, "
+          f"min {walls[0] * 1000:.1f} ms wall over {repeat} runs, "
+          f"{sum(modules.values()) / 1000:.1f} ms in imports")
+    for name, self_us in sorted(modules.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10, help='heaviest packages to list')
+    args = parser.parse_args()
+
+    imported = bench('import controller', args.repeat, args.top)
+    loaded = [name for name in ('fitz', 'pymupdf') if name in imported]
+    print(f"PyMuPDF imported at startup: {', '.join(loaded) if loaded else 'no'}")
+    bench('import fitz', args.repeat, 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Question content hashes, bank versions, import logs and quiz attempts
+
+Revision ID: 17c61be5437a
+Revises: b02df21dcbf2
+Create Date: 2026-10-17 10:09:12.904417
+
+Replaces upgrade_schema() and the tables db.create_all() used to add at startup.
+Tables and columns that a database already got that way are left as they are.
+"""
+import hashlib
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '17c61be5437a'
+down_revision = 'b02df21dcbf2'
+branch_labels = None
+depends_on = None
+
+
+def clean_text(text):
+    # Frozen copy of controller.clean_text at this revision
+    if text is None:
+        return ""
+    text = text.replace('\xa0', ' ').strip().lower()
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('→', ' ').replace('->', ' ')
+    return text
+
+
+def question_content_hash(row):
+    # Frozen copy of controller.question_content_hash at this revision
+    parts = [clean_text(row[key]) for key in ('question_text', 'option1', 'option2', 'option3', 'option4')]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    question_columns = {column['name'] for column in inspector.get_columns('question')}
+    question_indexes = {index['name'] for index in inspector.get_indexes('question')}
+
+    with op.batch_alter_table('question') as batch_op:
+        if 'content_hash' not in question_columns:
+            batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        if 'ix_question_content_hash' not in question_indexes:
+            batch_op.create_index('ix_question_content_hash', ['content_hash'], unique=False)
+        # SQLite never enforced the VARCHAR lengths; other databases would reject long PDF questions
+        for column in ('question_text', 'option1', 'option2', 'option3', 'option4'):
+            batch_op.alter_column(column, type_=sa.Text(), existing_nullable=False)
+
+    question = sa.table('question', sa.column('id', sa.Integer), sa.column('question_text', sa.Text),
+                        sa.column('option1', sa.Text), sa.column('option2', sa.Text), sa.column('option3', sa.Text),
+                        sa.column('option4', sa.Text), sa.column('subject', sa.String),
+                        sa.column('content_hash', sa.String))
+    rows = bind.execute(sa.select(question).where(question.c.content_hash.is_(None))).mappings().all()
+    if rows:
+        bind.execute(
+            question.update().where(question.c.id == sa.bindparam('b_id')).values(content_hash=sa.bindparam('b_hash')),
+            [{'b_id': row['id'], 'b_hash': question_content_hash(row)} for row in rows]
+        )
+
+    if 'subject_version' not in existing:
+        subject_version = op.create_table('subject_version',
+            sa.Column('subject', sa.String(length=100), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('subject')
+        )
+        # Questions without a subject are tracked under the empty string
+        subjects = {subject or '' for subject in bind.execute(sa.select(question.c.subject).distinct()).scalars()}
+        op.bulk_insert(subject_version, [{'subject': subject, 'version': 1} for subject in sorted(subjects)])
+
+    if 'import_log' not in existing:
+        op.create_table('import_log',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('subject', sa.String(length=100), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('questions_parsed', sa.Integer(), nullable=False),
+            sa.Column('questions_skipped', sa.Integer(), nullable=False),
+            sa.Column('questions_inserted', sa.Integer(), nullable=False),
+            sa.Column('duplicates', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'attempt' not in existing:
+        op.create_table('attempt',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('subjects', sa.Text(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=False),
+            sa.Column('submitted_at', sa.DateTime(), nullable=True),
+            sa.Column('score', sa.Integer(), nullable=True),
+            sa.Column('total', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_attempt_user_id', 'attempt', ['user_id'], unique=False)
+
+    if 'attempt_answer' not in existing:
+        op.create_table('attempt_answer',
+            sa.Column('attempt_id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('selected', sa.Integer(), nullable=True),
+            sa.Column('marked', sa.Boolean(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['attempt_id'], ['attempt.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['question_id'], ['question.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('attempt_id', 'question_id')
+        )
+
+
+def downgrade():
+    op.drop_table('attempt_answer')
+    op.drop_index('ix_attempt_user_id', table_name='attempt')
+    op.drop_table('attempt')
+    op.drop_table('import_log')
+    op.drop_table('subject_version')
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_index('ix_question_content_hash')
+        batch_op.drop_column('content_hash')
+        batch_op.alter_column('question_text', type_=sa.String(length=500), existing_nullable=False)
+        for column in ('option1', 'option2', 'option3', 'option4'):
+            batch_op.alter_column(column, type_=sa.String(length=200), existing_nullable=False)
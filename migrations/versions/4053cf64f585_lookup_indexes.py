@@ -0,0 +1,32 @@
+"""Indexes for subject filtering, keyset paging and attempt answers
+
+Revision ID: 4053cf64f585
+Revises: 17c61be5437a
+Create Date: 2026-10-17 10:15:37.552980
+
+(subject, id) serves both subject filters and keyset pages within a subject, so no
+separate single-column index on subject is added. attempt_answer.question_id backs
+the ON DELETE CASCADE from question, which would otherwise scan every answer.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4053cf64f585'
+down_revision = '17c61be5437a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.create_index('ix_question_subject_id', ['subject', 'id'], unique=False)
+    with op.batch_alter_table('attempt_answer') as batch_op:
+        batch_op.create_index('ix_attempt_answer_question_id', ['question_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('attempt_answer') as batch_op:
+        batch_op.drop_index('ix_attempt_answer_question_id')
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_index('ix_question_subject_id')
@@ -0,0 +1,33 @@
+"""Question difficulty and topic, generated papers on attempts
+
+Revision ID: 9b1e4c2d7a31
+Revises: 4053cf64f585
+Create Date: 2026-10-17 11:02:41.318205
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e4c2d7a31'
+down_revision = '4053cf64f585'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.add_column(sa.Column('difficulty', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('topic', sa.String(length=100), nullable=True))
+    with op.batch_alter_table('attempt') as batch_op:
+        batch_op.add_column(sa.Column('seed', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('paper', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('attempt') as batch_op:
+        batch_op.drop_column('paper')
+        batch_op.drop_column('seed')
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_column('topic')
+        batch_op.drop_column('difficulty')
@@ -0,0 +1,58 @@
+"""Initial schema: users, questions and subject configs
+
+Revision ID: b02df21dcbf2
+Revises:
+Create Date: 2026-10-17 10:02:41.318204
+
+Databases created by db.create_all() before migrations existed already have
+these tables; they are left as they are and adopted by this revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b02df21dcbf2'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'user' not in existing:
+        op.create_table('user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=150), nullable=False),
+            sa.Column('password', sa.String(length=200), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('username')
+        )
+    if 'question' not in existing:
+        op.create_table('question',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('question_text', sa.String(length=500), nullable=False),
+            sa.Column('option1', sa.String(length=200), nullable=False),
+            sa.Column('option2', sa.String(length=200), nullable=False),
+            sa.Column('option3', sa.String(length=200), nullable=False),
+            sa.Column('option4', sa.String(length=200), nullable=False),
+            sa.Column('correct_answer', sa.Integer(), nullable=False),
+            sa.Column('subject', sa.String(length=100), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'subject_config' not in existing:
+        op.create_table('subject_config',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('subject_name', sa.String(length=100), nullable=False),
+            sa.Column('start_q_num', sa.Integer(), nullable=False),
+            sa.Column('end_q_num', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('subject_name')
+        )
+
+
+def downgrade():
+    op.drop_table('subject_config')
+    op.drop_table('question')
+    op.drop_table('user')
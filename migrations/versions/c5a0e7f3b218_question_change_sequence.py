@@ -0,0 +1,50 @@
+"""Change sequence on questions and tombstones for /api/questions/changes
+
+Revision ID: c5a0e7f3b218
+Revises: 9b1e4c2d7a31
+Create Date: 2026-10-17 11:47:05.662190
+
+Existing questions all get change sequence 1, so a client syncing from 0 receives the whole bank.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a0e7f3b218'
+down_revision = '9b1e4c2d7a31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    change_sequence = op.create_table('change_sequence',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('question_tombstone',
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(length=100), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('question_id', 'subject')
+    )
+    op.create_index('ix_question_tombstone_change_seq', 'question_tombstone', ['change_seq'], unique=False)
+
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+    op.execute(sa.text('UPDATE question SET change_seq = 1'))
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.alter_column('change_seq', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.create_index('ix_question_change_seq', ['change_seq', 'id'], unique=False)
+
+    op.bulk_insert(change_sequence, [{'id': 1, 'value': 1}])
+
+
+def downgrade():
+    with op.batch_alter_table('question') as batch_op:
+        batch_op.drop_index('ix_question_change_seq')
+        batch_op.drop_column('change_seq')
+    op.drop_index('ix_question_tombstone_change_seq', table_name='question_tombstone')
+    op.drop_table('question_tombstone')
+    op.drop_table('change_sequence')
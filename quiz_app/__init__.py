@@ -0,0 +1,105 @@
+"""
+JEE quiz application.
+
+create_app() builds the Flask app; importing this package does not load PyMuPDF or
+touch the database, so worker boots, CLI commands and PDF extraction processes start fast.
+"""
+import os
+
+from flask import Flask
+from sqlalchemy import event
+
+from .config import database_url, engine_options
+from .extensions import db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app(config=None):
+    """
+    Creates and configures the app. config (a dict) overrides the defaults below,
+    e.g. {'SQLALCHEMY_DATABASE_URI': ...} for a scratch database.
+    """
+    app = Flask(__name__, template_folder=os.path.join(ROOT, 'templates'),
+                static_folder=os.path.join(ROOT, 'static'))
+    app.secret_key = 'your_secret_key_here'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DB_COPY_BATCH_SIZE'] = 1000 # Rows per executemany when copying tables with `flask copy-db`
+    # Applied to every new SQLite connection. WAL lets readers run alongside the single writer;
+    # synchronous=NORMAL is durable against application crashes in WAL mode (a power loss may drop
+    # the last commits); busy_timeout makes writers wait for the lock instead of failing.
+    app.config['SQLITE_PRAGMAS'] = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000, # ms
+        'cache_size': -64000, # negative means KiB, so 64 MB of page cache per connection
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY'
+    }
+    app.config['QUIZ_FOLDER'] = os.path.join(ROOT, 'static')
+    app.config['ADMIN_PAGE_SIZE'] = 50 # Questions per page of the admin table
+    app.config['QUESTIONS_PAGE_SIZE'] = 100 # Default page size for /api/questions
+    app.config['QUESTIONS_MAX_PAGE_SIZE'] = 500
+    app.config['QUESTIONS_RESPONSE_CACHE_SIZE'] = 256 # Encoded /api/questions pages kept in memory
+    app.config['QUESTION_READ_BATCH'] = 1000 # Rows fetched per batch when streaming questions from the database
+    app.config['QUESTION_INSERT_BATCH_SIZE'] = 500 # Rows per executemany batch when bulk-inserting questions
+    app.config['INGEST_WORKERS'] = 2 # Background threads processing PDF uploads
+    app.config['PDF_EXTRACT_WORKERS'] = os.cpu_count() or 1 # Processes extracting PDF text; 1 disables the pool
+    app.config['PDF_EXTRACT_PAGES_PER_TASK'] = 8 # Pages each extraction worker handles per task
+    app.config['PARSE_CACHE_FOLDER'] = os.path.join(app.instance_path, 'parse_cache') # Parsed PDFs by file digest
+    app.config['PARSE_CACHE_MAX_BYTES'] = 256 * 1024 * 1024 # Least recently used entries are evicted beyond this
+    app.config['QUIZ_DURATION_SECONDS'] = 1800 # Time limit of an attempt
+    app.config['QUIZ_GRACE_SECONDS'] = 30 # Late answer saves accepted after the time limit (network delays)
+    app.config['ANSWERS_MAX_BATCH'] = 500 # Answer deltas accepted per /api/attempts/<id>/answers call
+    # 0 writes every answer save through. A positive interval buffers saves in memory and writes them at
+    # least this often; only for a single worker process, since a submit only sees its own process' buffer.
+    app.config['ANSWER_FLUSH_SECONDS'] = 0
+    app.config['ANSWER_FLUSH_MAX_PENDING'] = 5000 # Buffered answers that trigger an early flush
+    app.config['PAPER_QUESTIONS_PER_SUBJECT'] = 30 # Default size of each subject's section in a generated paper
+    app.config['PAPER_MAX_QUESTIONS_PER_SUBJECT'] = 200
+    app.config['PAPER_SAMPLE_BATCH'] = 500 # Candidate ids looked up per query when sampling a paper
+    app.config['PAPER_SAMPLE_ROUNDS'] = 4 # Random-id rounds before sampling falls back to id seeks
+    app.config['INGEST_JOB_HISTORY'] = 100 # Finished upload jobs kept for /jobs/<id>
+    app.config['IMPORT_REPORT_FOLDER'] = os.path.join(app.instance_path, 'import_reports') # Rejected rows of /admin/import, by ImportLog id
+    app.config.update(config or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    db.init_app(app)
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true': # Set by the `flask` command
+        init_migrations(app)
+    with app.app_context():
+        apply_sqlite_pragmas(app)
+
+    from . import admin, auth, ingest, quiz
+    from .cli import copy_db, import_questions_command
+    app.register_blueprint(auth.bp)
+    app.register_blueprint(quiz.bp)
+    app.register_blueprint(admin.bp)
+    app.register_blueprint(ingest.bp)
+    app.cli.add_command(copy_db)
+    app.cli.add_command(import_questions_command)
+    return app
+
+
+def init_migrations(app):
+    """
+    Adds the Flask-Migrate `flask db ...` commands; schema changes live in migrations/.
+    Alembic takes a good part of the startup time to import, so create_app() only does this
+    for `flask` CLI commands, not for web workers.
+    """
+    from flask_migrate import Migrate
+    Migrate(app, db, directory=os.path.join(ROOT, 'migrations'), render_as_batch=True)
+
+
+def apply_sqlite_pragmas(app):
+    """Applies SQLITE_PRAGMAS to each new connection of the app's engine if it is SQLite."""
+    if db.engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(db.engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in app.config['SQLITE_PRAGMAS'].items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
@@ -0,0 +1,390 @@
+"""Admin panel: adding, editing, deleting, importing and exporting questions (blueprint 'admin')."""
+import csv
+import os
+import uuid
+
+from flask import (Blueprint, current_app, jsonify, redirect, render_template, request, send_from_directory, session,
+                   stream_with_context, url_for)
+
+from .export import FORMATS, export_chunks, gzip_chunks
+from .extensions import db
+from .importer import ImportReport, guess_format, import_questions, parse_answer, parse_difficulty
+from .models import (ImportLog, Question, SubjectConfig, SubjectVersion, add_tombstone, bump_bank_version,
+                     next_change_seq)
+from .question_bank import question_content_hash
+from .quiz import requested_subjects
+
+bp = Blueprint('admin', __name__)
+
+
+def form_difficulty():
+    """Difficulty from the submitted form: 1-3, or None if not rated."""
+    difficulty = request.form.get('difficulty', '')
+    return int(difficulty) if difficulty in ('1', '2', '3') else None
+
+def form_topic():
+    return request.form.get('topic', '').strip()[:100] or None
+
+def question_page(subject=None, search=None, after_id=None, before_id=None, limit=50):
+    """
+    Returns (questions, before_id, after_id) for one keyset page of the admin table: up to limit
+    questions in id order, then the cursors of the previous and next pages (None at either end).
+    search matches the question text, options and topic, case-insensitively.
+    """
+    query = Question.query
+    if subject:
+        query = query.filter(Question.subject == subject)
+    if search:
+        pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query = query.filter(db.or_(*(column.ilike(pattern, escape='\\') for column in (
+            Question.question_text, Question.option1, Question.option2, Question.option3, Question.option4,
+            Question.topic))))
+
+    # Fetch one extra row to know whether the page has a neighbour in the direction of travel.
+    if before_id is not None:
+        questions = query.filter(Question.id < before_id).order_by(Question.id.desc()).limit(limit + 1).all()
+        has_previous, has_next = len(questions) > limit, True
+        questions = questions[:limit][::-1]
+    else:
+        questions = query.filter(Question.id > (after_id or 0)).order_by(Question.id).limit(limit + 1).all()
+        has_previous, has_next = after_id is not None, len(questions) > limit
+        questions = questions[:limit]
+    if not questions:
+        return questions, None, None
+    return questions, questions[0].id if has_previous else None, questions[-1].id if has_next else None
+
+def render_admin_panel(error=None):
+    """Renders the admin panel with the page of the question table selected by the query string."""
+    subject = request.args.get('subject', '').strip()
+    search = request.args.get('q', '').strip()
+    questions, before_id, after_id = question_page(
+        subject, search, request.args.get('after_id', type=int), request.args.get('before_id', type=int),
+        current_app.config['ADMIN_PAGE_SIZE'])
+    # subject_configs are still passed to admin.html in case you want to display them
+    # or manage them for manually added questions, even if not used by PDF upload directly.
+    return render_template('admin.html',
+                           questions=questions,
+                           subject=subject,
+                           search=search,
+                           before_id=before_id,
+                           after_id=after_id,
+                           subjects=db.session.execute(db.select(SubjectVersion.subject).where(
+                               SubjectVersion.subject != '').order_by(SubjectVersion.subject)).scalars().all(),
+                           subject_configs=SubjectConfig.query.all(), # Still pass them
+                           import_logs=ImportLog.query.order_by(ImportLog.id.desc()).limit(20).all(),
+                           error=error)
+
+def save_question_edit(question, old_subject):
+    """Rehashes an edited question and records the change for caches and syncing clients, then commits."""
+    question.content_hash = question_content_hash({
+        'question_text': question.question_text,
+        'option1': question.option1, 'option2': question.option2,
+        'option3': question.option3, 'option4': question.option4
+    })
+    question.change_seq = next_change_seq()
+    if (old_subject or '') != (question.subject or ''):
+        add_tombstone(question.id, old_subject, question.change_seq)
+    bump_bank_version(old_subject, question.subject)
+    db.session.commit()
+
+def parse_question_patch(payload):
+    """
+    Validates the body of PATCH /admin/questions/<id>: any of question_text, option1-option4,
+    correct_answer (0-3, A-D or -1), subject, difficulty (1-3, easy/medium/hard or null) and topic.
+    Returns (changes, error).
+    """
+    if not isinstance(payload, dict):
+        return None, 'Expected a JSON object.'
+    unknown = set(payload) - {'question_text', 'option1', 'option2', 'option3', 'option4', 'correct_answer',
+                              'subject', 'difficulty', 'topic'}
+    if unknown:
+        return None, f"Unknown fields: {', '.join(sorted(unknown))}."
+
+    changes = {}
+    for field in ('question_text', 'option1', 'option2', 'option3', 'option4'):
+        if field in payload:
+            if not isinstance(payload[field], str) or not payload[field].strip():
+                return None, f'{field} must be non-empty text.'
+            changes[field] = payload[field]
+    if 'correct_answer' in payload:
+        changes['correct_answer'], error = parse_answer(payload['correct_answer'])
+        if error:
+            return None, error
+    if 'subject' in payload:
+        subject = payload['subject']
+        if subject is not None and not isinstance(subject, str):
+            return None, 'subject must be text or null.'
+        changes['subject'] = (subject or '').strip()[:100] or None
+    if 'difficulty' in payload:
+        changes['difficulty'], error = parse_difficulty(payload['difficulty'])
+        if error:
+            return None, error
+    if 'topic' in payload:
+        if payload['topic'] is not None and not isinstance(payload['topic'], str):
+            return None, 'topic must be text or null.'
+        changes['topic'] = (payload['topic'] or '').strip()[:100] or None
+    return changes, None
+
+
+@bp.route('/admin', methods=['GET', 'POST'])
+def admin_panel():
+    """
+    Admin panel for managing questions (add, edit, delete).
+    The question table is paginated by id and can be filtered with ?subject= and searched
+    with ?q=; rows are edited in place through PATCH/DELETE /admin/questions/<id>.
+    Subject configuration management (add/edit/delete SubjectConfig) removed from here
+    as per new PDF upload workflow.
+    Requires admin login.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return redirect(url_for('auth.login'))
+
+    error = None
+
+    if request.method == 'POST':
+        # Handle adding Questions (this part remains as it was)
+        # Assuming your add question form has a submit button named 'add_question'
+        if 'add_question' in request.form:
+            question_text = request.form['question']
+            option1 = request.form['option1']
+            option2 = request.form['option2']
+            option3 = request.form['option3']
+            option4 = request.form['option4']
+            correct_answer = request.form.get('correct')
+            subject = request.form.get('subject', 'General') # Get subject from form, default to 'General'
+
+            if correct_answer not in ['0', '1', '2', '3']:
+                correct_answer_int = -1
+            else:
+                correct_answer_int = int(correct_answer)
+
+            if not all([question_text, option1, option2, option3, option4]):
+                error = "All question fields are required."
+            else:
+                new_q = Question(
+                    question_text=question_text,
+                    option1=option1,
+                    option2=option2,
+                    option3=option3,
+                    option4=option4,
+                    correct_answer=correct_answer_int,
+                    subject=subject, # Save the subject
+                    difficulty=form_difficulty(),
+                    topic=form_topic(),
+                    change_seq=next_change_seq()
+                )
+                new_q.content_hash = question_content_hash({
+                    'question_text': question_text,
+                    'option1': option1, 'option2': option2, 'option3': option3, 'option4': option4
+                })
+                db.session.add(new_q)
+                bump_bank_version(subject)
+                db.session.commit()
+                # Redirect to avoid re-submission on refresh
+                return redirect(url_for('admin.admin_panel'))
+        # If it's a file upload, it will be handled by upload_pdf route which redirects here
+        # Any other POST requests will be handled by other routes (e.g., /edit_question, /delete_question)
+        # or fall through if not matched.
+        else:
+            # If a POST request reached here and wasn't handled by 'add_question' or redirected by 'upload_pdf',
+            # it might be an unhandled form submission. Re-render with existing data.
+            pass
+
+
+    # GET request: render admin panel, one page of the question table at a time
+    return render_admin_panel(error)
+
+@bp.route('/edit_question/<int:question_id>', methods=['POST'])
+def edit_question(question_id):
+    """
+    Handles editing an existing question.
+    Requires admin login.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return redirect(url_for('auth.login'))
+
+    question = Question.query.get_or_404(question_id)
+    old_subject = question.subject
+    question.question_text = request.form['question']
+    question.option1 = request.form['option1']
+    question.option2 = request.form['option2']
+    question.option3 = request.form['option3']
+    question.option4 = request.form['option4']
+    correct_answer = request.form.get('correct')
+
+    if correct_answer not in ['0', '1', '2', '3']:
+        question.correct_answer = -1
+    else:
+        question.correct_answer = int(correct_answer)
+
+    # Forms without these fields leave them unchanged
+    if 'subject' in request.form:
+        question.subject = request.form['subject'].strip() or 'General'
+    if 'difficulty' in request.form:
+        question.difficulty = form_difficulty()
+    if 'topic' in request.form:
+        question.topic = form_topic()
+    save_question_edit(question, old_subject)
+    return redirect(url_for('admin.admin_panel'))
+
+@bp.route('/delete_question/<int:question_id>', methods=['POST'])
+def delete_question(question_id):
+    """
+    Handles deleting a question.
+    Requires admin login.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return redirect(url_for('auth.login'))
+
+    question = Question.query.get(question_id)
+    if question:
+        db.session.delete(question)
+        add_tombstone(question.id, question.subject, next_change_seq())
+        bump_bank_version(question.subject)
+        db.session.commit()
+        return redirect(url_for('admin.admin_panel'))
+    return "Question not found", 404
+
+@bp.route('/admin/questions/<int:question_id>', methods=['PATCH'])
+def patch_question(question_id):
+    """
+    Updates the fields of one question given in a JSON body (see parse_question_patch) and
+    responds with the question's re-rendered admin table row, so the page swaps in that row
+    instead of reloading the table. Requires admin login.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return jsonify({'error': 'Admin login required'}), 403
+
+    changes, error = parse_question_patch(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    question = db.session.get(Question, question_id)
+    if question is None:
+        return jsonify({'error': 'Question not found'}), 404
+
+    old_subject = question.subject
+    for field, value in changes.items():
+        setattr(question, field, value)
+    save_question_edit(question, old_subject)
+    return render_template('question_row.html', q=question)
+
+@bp.route('/admin/questions/<int:question_id>', methods=['DELETE'])
+def remove_question(question_id):
+    """Deletes one question; the page removes its row. Requires admin login."""
+    if 'username' not in session or session['username'] != 'admin':
+        return jsonify({'error': 'Admin login required'}), 403
+
+    question = db.session.get(Question, question_id)
+    if question is None:
+        return jsonify({'error': 'Question not found'}), 404
+    db.session.delete(question)
+    add_tombstone(question.id, question.subject, next_change_seq())
+    bump_bank_version(question.subject)
+    db.session.commit()
+    return '', 204
+
+@bp.route('/admin/export')
+def export_questions():
+    """
+    Streams the whole question bank, answer keys included, for backups and integrations.
+    Requires admin login.
+
+    Query parameters:
+      format  - 'json' (one JSON array, the default) or 'jsonl' (one question per line)
+      subject - filter by subject, may be repeated (omitted or 'All' means every subject)
+
+    The body is gzip-compressed on the fly for clients that accept it. Memory use does not grow
+    with the bank: rows are read and encoded one batch at a time while the response is sent.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return jsonify({'error': 'Admin login required'}), 403
+
+    fmt = request.args.get('format', 'json')
+    if fmt not in FORMATS:
+        return jsonify({'error': "format must be 'json' or 'jsonl'"}), 400
+
+    chunks = export_chunks(requested_subjects(), fmt)
+    headers = {
+        'Content-Disposition': f'attachment; filename=questions.{fmt}',
+        'Cache-Control': 'no-store',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.accept_encodings.quality('gzip') > 0:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    # The generator reads from the database while the response is sent, so it needs the context.
+    return current_app.response_class(stream_with_context(chunks), mimetype=FORMATS[fmt], headers=headers)
+
+@bp.route('/admin/import', methods=['POST'])
+def import_questions_upload():
+    """
+    Imports questions with their answer keys from an uploaded CSV or JSON Lines file (field
+    'file'; layout in quiz_app/importer.py). Requires admin login.
+
+    Form fields:
+      subject  - subject for rows that have none
+      existing - 'update' (the default) overwrites questions already in the bank, 'skip' keeps them
+      format   - 'csv' or 'jsonl'; by default taken from the file extension
+
+    The whole file is imported in one transaction. Responds with the row counts; rejected rows
+    are listed in a CSV report that can be downloaded from 'errors_url'.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return jsonify({'error': 'Admin login required'}), 403
+
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return jsonify({'error': 'No file uploaded'}), 400
+    fmt = request.form.get('format') or guess_format(file.filename)
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'error': 'Upload a .csv or .jsonl file, or set format.'}), 400
+    existing = request.form.get('existing', 'update')
+    if existing not in ('update', 'skip'):
+        return jsonify({'error': "existing must be 'update' or 'skip'"}), 400
+    subject = request.form.get('subject', '').strip() or None
+
+    folder = current_app.config['IMPORT_REPORT_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    tmp_path = os.path.join(folder, f'{uuid.uuid4().hex}.tmp')
+    try:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as report_file:
+            report = ImportReport(report_file)
+            try:
+                result = import_questions(file.stream, fmt, subject, duplicates=existing, report=report)
+            except (UnicodeDecodeError, csv.Error) as e:
+                db.session.rollback()
+                return jsonify({'error': f'Could not read the file: {e}'}), 400
+
+        log = ImportLog(
+            filename=os.path.basename(file.filename)[:255],
+            subject=subject,
+            questions_parsed=report.rows,
+            questions_skipped=report.rejected,
+            questions_inserted=result.inserted,
+            duplicates=result.duplicates
+        )
+        db.session.add(log)
+        db.session.commit()
+        if report.rejected:
+            os.replace(tmp_path, os.path.join(folder, f'{log.id}.csv'))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return jsonify({
+        'rows': report.rows,
+        'inserted': result.inserted,
+        'updated': result.updated,
+        'duplicates': result.duplicates,
+        'rejected': report.rejected,
+        'errors_url': url_for('admin.import_errors', log_id=log.id) if report.rejected else None
+    })
+
+@bp.route('/admin/import/<int:log_id>/errors')
+def import_errors(log_id):
+    """Downloads the rejected rows of an import as CSV (row, field, error). Requires admin login."""
+    if 'username' not in session or session['username'] != 'admin':
+        return jsonify({'error': 'Admin login required'}), 403
+
+    return send_from_directory(current_app.config['IMPORT_REPORT_FOLDER'], f'{log_id}.csv', mimetype='text/csv',
+                               as_attachment=True, download_name=f'import-{log_id}-errors.csv')
@@ -0,0 +1,231 @@
+"""
+Quiz attempts: validating and saving answer deltas, the write-behind answer buffer
+and server-side scoring.
+"""
+import atexit
+import json
+import threading
+
+from flask import current_app, session
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .extensions import db
+from .models import Attempt, AttemptAnswer, Question, User, utcnow
+
+
+def upsert(model, index_elements, update_columns):
+    """
+    Returns an INSERT ... ON CONFLICT DO UPDATE statement for model, for the
+    database in use (SQLite and PostgreSQL share the syntax).
+    """
+    insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+    statement = insert(model.__table__)
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: statement.excluded[column] for column in update_columns}
+    )
+
+def current_user():
+    """Returns the logged-in User, or None for the admin and anonymous visitors."""
+    if 'username' not in session or session['username'] == 'admin':
+        return None
+    return User.query.filter_by(username=session['username']).first()
+
+def get_user_attempt(attempt_id):
+    """Returns the attempt if it belongs to the logged-in user, else None."""
+    user = current_user()
+    if user is None:
+        return None
+    return Attempt.query.filter_by(id=attempt_id, user_id=user.id).first()
+
+def is_int(value):
+    """True for JSON integers; bools (True == 1) and floats such as 1.0 do not count."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_answer_deltas(payload):
+    """
+    Validates the body of /api/attempts/<id>/answers.
+    Each delta carries the full current state of one question: question_id, selected (0-3 or null)
+    and marked. Returns (rows, error).
+    """
+    if not isinstance(payload, dict) or not isinstance(payload.get('answers'), list):
+        return None, "Expected a JSON object with an 'answers' list."
+    answers = payload['answers']
+    if len(answers) > current_app.config['ANSWERS_MAX_BATCH']:
+        return None, f"At most {current_app.config['ANSWERS_MAX_BATCH']} answers per request."
+
+    rows = {}
+    now = utcnow()
+    for answer in answers:
+        if not isinstance(answer, dict) or not is_int(answer.get('question_id')):
+            return None, "Every answer needs an integer question_id."
+        selected = answer.get('selected')
+        if selected is not None and not (is_int(selected) and 0 <= selected <= 3):
+            return None, "selected must be 0-3 or null."
+        # Later deltas for the same question replace earlier ones
+        rows[answer['question_id']] = {
+            'question_id': answer['question_id'],
+            'selected': selected,
+            'marked': bool(answer.get('marked', False)),
+            'updated_at': now
+        }
+    # Ignore answers to questions that do not exist (anymore)
+    known = set(db.session.execute(db.select(Question.id).where(Question.id.in_(rows))).scalars())
+    return [row for question_id, row in rows.items() if question_id in known], None
+
+def save_answers(attempt_id, rows):
+    """Upserts answer rows for an attempt in one executemany statement; the caller commits."""
+    write_answer_rows([dict(row, attempt_id=attempt_id) for row in rows])
+
+def write_answer_rows(rows):
+    """
+    Upserts answer rows (each carrying its attempt_id) in one executemany statement; the caller commits.
+    Rows for questions deleted since the answer was accepted are dropped, since PostgreSQL enforces
+    the foreign key (SQLite does not by default).
+    """
+    if rows:
+        known = set(db.session.execute(
+            db.select(Question.id).where(Question.id.in_({row['question_id'] for row in rows}))).scalars())
+        rows = [row for row in rows if row['question_id'] in known]
+    if rows:
+        db.session.execute(
+            upsert(AttemptAnswer, ['attempt_id', 'question_id'], ['selected', 'marked', 'updated_at']),
+            rows
+        )
+
+
+class AnswerBuffer:
+    """
+    Write-behind buffer for answer saves.
+    Saves are kept in memory per attempt and question, so repeated clicks on the same question
+    collapse into one row, and a background thread writes everything pending in one transaction
+    every ANSWER_FLUSH_SECONDS (or sooner once ANSWER_FLUSH_MAX_PENDING rows are waiting).
+    Submitting an attempt takes its pending rows and writes them together with the score.
+
+    Buffering is off by default (ANSWER_FLUSH_SECONDS = 0: every save is written through).
+    The buffer lives in the process that received the saves, and a submit only takes the rows of
+    its own process, so only enable it when the app runs as a single worker process: with several
+    workers, a submit handled by one worker would score the attempt without the answers another
+    worker still holds.
+    """
+
+    def __init__(self):
+        self._pending = {} # attempt id -> {question id -> row}
+        self._pending_count = 0
+        self._lock = threading.Lock() # Guards _pending
+        self._flush_lock = threading.Lock() # Held while pending rows are being written
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._app = None # App whose database the buffered rows belong to, set on first add()
+
+    def add(self, attempt_id, rows):
+        """Buffers answer rows for an attempt; later rows for a question replace earlier ones."""
+        if current_app.config['ANSWER_FLUSH_SECONDS'] <= 0:
+            save_answers(attempt_id, rows)
+            db.session.commit()
+            return
+        with self._lock:
+            answers = self._pending.setdefault(attempt_id, {})
+            for row in rows:
+                if row['question_id'] not in answers:
+                    self._pending_count += 1
+                answers[row['question_id']] = dict(row, attempt_id=attempt_id)
+            full = self._pending_count >= current_app.config['ANSWER_FLUSH_MAX_PENDING']
+            if self._flusher is None:
+                self._app = current_app._get_current_object()
+                self._flusher = threading.Thread(target=self._run, args=(self._app,), name='answer-flush',
+                                                 daemon=True)
+                self._flusher.start()
+        if full:
+            self._wakeup.set()
+
+    def take(self, attempt_id):
+        """
+        Removes and returns the pending rows of one attempt, waiting for an in-progress flush
+        so that everything saved before this call is either returned or already in the database.
+        """
+        with self._flush_lock, self._lock:
+            answers = self._pending.pop(attempt_id, {})
+            self._pending_count -= len(answers)
+        return list(answers.values())
+
+    def flush(self):
+        """Writes all pending rows in one transaction. Rows are put back if the write fails."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending, self._pending_count = self._pending, {}, 0
+            rows = [row for answers in pending.values() for row in answers.values()]
+            if not rows:
+                return 0
+            try:
+                write_answer_rows(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self._restore(pending)
+                raise
+            return len(rows)
+
+    def _restore(self, pending):
+        """Re-queues rows from a failed flush unless a newer save for the same question arrived."""
+        with self._lock:
+            for attempt_id, answers in pending.items():
+                current = self._pending.setdefault(attempt_id, {})
+                for question_id, row in answers.items():
+                    if question_id not in current:
+                        current[question_id] = row
+                        self._pending_count += 1
+
+    def close(self):
+        """Writes whatever is still pending; used at interpreter exit."""
+        if self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+    def _run(self, app):
+        """Flusher thread: flushes on the interval, or early when woken by add()."""
+        while True:
+            self._wakeup.wait(app.config['ANSWER_FLUSH_SECONDS'])
+            self._wakeup.clear()
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    app.logger.exception('Flushing buffered answers failed; retrying on the next interval')
+
+
+answer_buffer = AnswerBuffer()
+
+@atexit.register
+def flush_answer_buffer():
+    """Writes buffered answers before the process exits."""
+    answer_buffer.close()
+
+def score_attempt(attempt):
+    """
+    Scores an attempt with one set-based UPDATE: the number of its answers matching the answer key,
+    out of the number of questions on its paper (generated papers) or in its subjects.
+    Does nothing if it was already submitted.
+    """
+    correct = (
+        db.select(db.func.count())
+        .select_from(AttemptAnswer)
+        .join(Question, Question.id == AttemptAnswer.question_id)
+        .where(AttemptAnswer.attempt_id == attempt.id, AttemptAnswer.selected == Question.correct_answer)
+    )
+    total = db.select(db.func.count()).select_from(Question)
+    subjects = json.loads(attempt.subjects)
+    if attempt.paper is not None:
+        # Answers of generated papers are limited to the paper when they are saved
+        total = total.where(Question.id.in_([question_id for question_id, _ in json.loads(attempt.paper)]))
+    elif subjects:
+        correct = correct.where(Question.subject.in_(subjects))
+        total = total.where(Question.subject.in_(subjects))
+
+    db.session.execute(
+        db.update(Attempt)
+        .where(Attempt.id == attempt.id, Attempt.submitted_at.is_(None))
+        .values(score=correct.scalar_subquery(), total=total.scalar_subquery(), submitted_at=utcnow())
+    )
+    db.session.commit()
+    db.session.refresh(attempt)
@@ -0,0 +1,61 @@
+"""Login, logout and registration (blueprint 'auth')."""
+from flask import Blueprint, redirect, render_template, request, session, url_for
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .extensions import db
+from .models import User
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.route('/')
+def home():
+    """Redirects the root URL to the login page."""
+    return redirect(url_for('auth.login'))
+
+
+@bp.route('/logout')
+def logout():
+    """Logs out the current user and redirects to the login page."""
+    session.pop('username', None)
+    return redirect(url_for('auth.login'))
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """Handles user login and admin login."""
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        user = User.query.filter_by(username=username).first()
+
+        # Admin login (hardcoded for simplicity, consider more robust solutions for production)
+        if username == 'admin' and password == 'admin':
+            session['username'] = 'admin'
+            return redirect(url_for('admin.admin_panel'))
+
+        # Regular user login
+        if user and check_password_hash(user.password, password):
+            session['username'] = user.username
+            return redirect(url_for('quiz.quiz'))
+        else:
+            return render_template('login.html', error='Invalid credentials')
+
+    return render_template('login.html')
+
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """Handles new user registration."""
+    if request.method == 'POST':
+        username = request.form['username']
+        password = generate_password_hash(request.form['password'])
+
+        if User.query.filter_by(username=username).first():
+            return render_template('register.html', error='Username already exists')
+
+        new_user = User(username=username, password=password)
+        db.session.add(new_user)
+        db.session.commit()
+        return redirect(url_for('auth.login'))
+
+    return render_template('register.html')
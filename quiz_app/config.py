@@ -0,0 +1,30 @@
+"""Database settings read from the environment."""
+import os
+
+
+def database_url():
+    """
+    The database URL from DATABASE_URL (default: instance/users.db).
+    Accepts the 'postgres://' scheme some hosts hand out, which SQLAlchemy no longer does.
+    """
+    url = os.environ.get('DATABASE_URL', 'sqlite:///users.db')
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url):
+    """
+    Connection pool settings for the engine, overridable per deployment with DB_POOL_SIZE,
+    DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE (seconds, -1 disables) and DB_POOL_PRE_PING (0/1).
+    Size the pool for one worker process: its request threads plus the background threads.
+    """
+    if url in ('sqlite://', 'sqlite:///:memory:'):
+        return {} # In-memory SQLite uses a single shared connection; pool settings do not apply
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)), # Connections kept open per worker process
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)), # Extra connections allowed during bursts
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)), # Seconds a request waits for a connection
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)), # Reconnect before server-side idle timeouts
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1') == '1' # Replace connections dropped by the server
+    }
@@ -0,0 +1,64 @@
+"""
+Streaming export of the question bank, answer keys included, as a JSON array or JSON Lines.
+
+Rows are read through a server-side cursor (yield_per) and encoded one batch at a time, so an
+export holds one batch in memory however large the bank is. Each row uses the Question column
+names, the same fields the importers accept.
+"""
+import json
+import zlib
+
+from flask import current_app
+
+from .extensions import db
+from .models import Question
+from .read_model import iter_tuples
+
+EXPORT_COLUMNS = (Question.id, Question.question_text, Question.option1, Question.option2, Question.option3,
+                  Question.option4, Question.correct_answer, Question.subject, Question.difficulty, Question.topic)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+FORMATS = {'json': 'application/json', 'jsonl': 'application/x-ndjson'}
+
+ROW_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def export_query(subjects=None):
+    query = db.select(*EXPORT_COLUMNS).order_by(Question.id)
+    if subjects:
+        query = query.where(Question.subject.in_(subjects))
+    return query
+
+
+def encoded_batches(subjects=None):
+    """Yields lists of up to QUESTION_READ_BATCH encoded export rows, in id order."""
+    batch_size = current_app.config['QUESTION_READ_BATCH']
+    batch = []
+    for values in iter_tuples(export_query(subjects)):
+        batch.append(ROW_ENCODER.encode(dict(zip(EXPORT_FIELDS, values))).encode('utf-8'))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_chunks(subjects=None, fmt='json'):
+    """Yields the export of the given subjects (every subject if empty) as byte chunks in fmt."""
+    if fmt == 'jsonl':
+        for batch in encoded_batches(subjects):
+            yield b'\n'.join(batch) + b'\n'
+        return
+    yield b'['
+    for i, batch in enumerate(encoded_batches(subjects)):
+        yield (b',' if i else b'') + b','.join(batch)
+    yield b']'
+
+
+def gzip_chunks(chunks, level=6):
+    """Compresses a stream of byte chunks into one gzip stream as they are produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
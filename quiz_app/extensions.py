@@ -0,0 +1,4 @@
+"""Flask extensions, bound to the app in create_app()."""
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
@@ -0,0 +1,190 @@
+"""
+Bulk import of questions with their answer keys from CSV or JSON Lines files, for
+/admin/import and `flask import-questions`.
+
+Files are read as a stream and validated row by row while bulk_insert_questions writes the
+valid rows in batches, so memory stays bounded by one batch however large the file is.
+A rejected row does not stop the import: it is written to a CSV error report instead.
+
+Each row (a CSV record or a JSON object per line) has:
+    question_text (or question), option1-option4 (or, in JSON, an 'options' list of four),
+    correct_answer (or answer): 0-3 or A-D, or -1 if not known yet (as exported for PDF questions),
+    subject (optional if the import has a default subject),
+    difficulty (optional: 1-3 or easy/medium/hard), topic (optional; when a row leaves either
+    out or empty, a question it updates keeps its current value).
+Other fields, such as the id column of /admin/export files, are ignored. Questions already in
+the bank are matched by content hash, as for PDF uploads.
+"""
+import csv
+import io
+import json
+import os
+
+from .ingest import bulk_insert_questions
+from .papers import DIFFICULTY_LEVELS
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+ANSWER_LETTERS = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
+REPORT_HEADER = ['row', 'field', 'error']
+
+
+def guess_format(filename):
+    """Returns 'csv' or 'jsonl' from the file extension, or None if it is neither."""
+    return FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def read_records(stream, fmt):
+    """
+    Yields (row number, record, error) for each row of a binary file stream: record is a dict,
+    or None with an error if the row could not be read. CSV rows are numbered as in a
+    spreadsheet (the header is row 1), JSON Lines rows by line.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for row, record in enumerate(csv.DictReader(text), start=2):
+            if None in record: # More values than header columns
+                yield row, None, 'Row has more values than the header has columns.'
+            else:
+                yield row, record, None
+        return
+    for row, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f'Invalid JSON: {e}'
+            continue
+        if isinstance(record, dict):
+            yield row, record, None
+        else:
+            yield row, None, 'Expected a JSON object.'
+
+
+def text_field(record, *names):
+    """The first of names present in record, as stripped text ('' if missing or empty)."""
+    for name in names:
+        value = record.get(name)
+        if value is not None:
+            return str(value).strip()
+    return ''
+
+def parse_answer(value):
+    """Returns (0-3 or -1, error) for an answer given as 0-3 or A-D, or -1 for not set."""
+    if isinstance(value, int) and not isinstance(value, bool) and -1 <= value <= 3:
+        return value, None
+    if isinstance(value, str):
+        value = value.strip().upper()
+        if value in ('-1', '0', '1', '2', '3'):
+            return int(value), None
+        if value in ANSWER_LETTERS:
+            return ANSWER_LETTERS[value], None
+    return None, 'Answer must be 0-3 or A-D.'
+
+def parse_difficulty(value):
+    """Returns (1-3 or None, error) for a difficulty given as 1-3, easy/medium/hard or empty."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None, None
+    key = str(value).strip().lower()
+    if key in DIFFICULTY_LEVELS:
+        return DIFFICULTY_LEVELS[key], None
+    if key in ('1', '2', '3'):
+        return int(key), None
+    return None, 'Difficulty must be 1-3, easy, medium or hard.'
+
+
+def validate_record(record, default_subject=None):
+    """
+    Turns one imported record into a question dict for bulk_insert_questions.
+    Returns (question, None), or (None, (field, error)) if the record is rejected.
+    """
+    question_text = text_field(record, 'question_text', 'question')
+    if not question_text:
+        return None, ('question_text', 'Question text is required.')
+
+    options = record.get('options')
+    if options is not None:
+        if not isinstance(options, list) or len(options) != 4:
+            return None, ('options', 'options must be a list of four options.')
+        options = [str(option).strip() if option is not None else '' for option in options]
+    else:
+        options = [text_field(record, f'option{i}') for i in range(1, 5)]
+    for i, option in enumerate(options, start=1):
+        if not option:
+            return None, (f'option{i}', f'Option {i} is required.')
+
+    answer = record.get('correct_answer', record.get('answer'))
+    correct_answer, error = parse_answer(answer)
+    if error:
+        return None, ('correct_answer', error)
+
+    subject = text_field(record, 'subject') or default_subject
+    if not subject:
+        return None, ('subject', 'Subject is required (no default subject was given).')
+    if len(subject) > 100:
+        return None, ('subject', 'Subject is longer than 100 characters.')
+
+    difficulty, error = parse_difficulty(record.get('difficulty'))
+    if error:
+        return None, ('difficulty', error)
+
+    question = {
+        'question_text': question_text,
+        'option1': options[0],
+        'option2': options[1],
+        'option3': options[2],
+        'option4': options[3],
+        'correct_answer': correct_answer,
+        'subject': subject
+    }
+    # Missing or empty optional fields are left out, so updating a question keeps its current values
+    topic = text_field(record, 'topic')[:100]
+    if difficulty is not None:
+        question['difficulty'] = difficulty
+    if topic:
+        question['topic'] = topic
+    return question, None
+
+
+class ImportReport:
+    """Counts the rows of an import and writes every rejected row to a CSV error report."""
+
+    def __init__(self, report_file=None):
+        self.rows = 0
+        self.rejected = 0
+        self.writer = csv.writer(report_file) if report_file is not None else None
+
+    def reject(self, row, field, error):
+        if self.writer is not None:
+            if self.rejected == 0:
+                self.writer.writerow(REPORT_HEADER) # Imports without rejections leave the report empty
+            self.writer.writerow([row, field, error])
+        self.rejected += 1
+
+
+def valid_questions(records, default_subject, report):
+    """Passes on the valid questions of records (from read_records), reporting the others."""
+    for row, record, error in records:
+        report.rows += 1
+        if record is None:
+            report.reject(row, '', error)
+            continue
+        question, problem = validate_record(record, default_subject)
+        if problem is None:
+            yield question
+        else:
+            report.reject(row, *problem)
+
+
+def import_questions(stream, fmt, default_subject=None, duplicates='update', report=None):
+    """
+    Imports a CSV or JSON Lines file stream inside the current transaction; the caller commits.
+    duplicates is passed to bulk_insert_questions: 'update' (the default) overwrites questions
+    already in the bank, answer keys included, and 'skip' leaves them as they are.
+    Raises UnicodeDecodeError or csv.Error if the file itself cannot be read.
+    Returns the BulkInsertResult; row counts and rejections go to report.
+    """
+    if report is None:
+        report = ImportReport()
+    return bulk_insert_questions(valid_questions(read_records(stream, fmt), default_subject, report),
+                                 duplicates=duplicates)
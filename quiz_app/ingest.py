@@ -0,0 +1,426 @@
+"""
+PDF ingestion: bulk insertion of parsed questions, the on-disk parse cache,
+background upload jobs and the upload endpoints (blueprint 'ingest').
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, current_app, jsonify, redirect, request, session, url_for
+
+from .extensions import db
+from .models import ImportLog, Question, add_tombstone, bump_bank_version, next_change_seq
+from .parsing import PARSER_VERSION, ParseReport, iter_parsed_questions
+from .pdf import iter_pdf_pages
+from .question_bank import question_content_hash
+
+bp = Blueprint('ingest', __name__)
+
+
+def iter_batches(items, size):
+    """Groups an iterable into lists of at most `size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkInsertResult:
+    """Outcome of bulk_insert_questions."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.updated = 0
+        self.duplicates = 0 # Questions already in the bank (or repeated within the import)
+        self.ids = [] # Ids of inserted questions, only filled when return_ids is set
+
+
+# Columns overwritten when an import updates an existing question; the optional ones only if
+# the imported row has them, and new questions without them get these defaults
+OPTIONAL_FIELDS = {'correct_answer': -1, 'difficulty': None, 'topic': None}
+UPDATED_FIELDS = ('question_text', 'option1', 'option2', 'option3', 'option4', 'subject', *OPTIONAL_FIELDS)
+
+
+def bulk_insert_questions(questions_data, batch_size=None, return_ids=False, duplicates='skip'):
+    """
+    Inserts question dicts (as produced by process_pdf_content) with batched Core
+    INSERT ... executemany statements, without building a Question object per row.
+    Accepts any iterable, so a lazy parser can be consumed batch by batch.
+
+    Duplicates are detected by content hash with one indexed lookup per batch:
+    duplicates='skip' leaves existing questions untouched, 'update' overwrites them with the
+    imported text and subject (and answer, difficulty and topic, only where a row has those
+    keys), and None inserts everything.
+
+    Runs inside the current transaction, stamps every row written with one change sequence
+    number and bumps the version of every subject written; the caller commits (or rolls back)
+    the whole import at once.
+    Returns a BulkInsertResult; its ids are in input order if return_ids is set.
+    """
+    batch_size = batch_size or current_app.config['QUESTION_INSERT_BATCH_SIZE']
+    table = Question.__table__
+    statement = table.insert()
+    if return_ids:
+        statement = statement.returning(table.c.id, sort_by_parameter_order=True)
+
+    result = BulkInsertResult()
+    subjects = set()
+    change_seq = None # Allocated on the first batch; the whole import shares it
+    for batch in iter_batches(questions_data, batch_size):
+        if change_seq is None:
+            change_seq = next_change_seq()
+        rows = [dict(q_data, content_hash=question_content_hash(q_data), change_seq=change_seq) for q_data in batch]
+
+        updates = []
+        if duplicates:
+            hashes = {row['content_hash'] for row in rows}
+            existing = {content_hash: (question_id, subject) for content_hash, question_id, subject in db.session.execute(
+                db.select(table.c.content_hash, table.c.id, table.c.subject).where(table.c.content_hash.in_(hashes)))}
+            new_rows = []
+            for row in rows:
+                if row['content_hash'] in existing:
+                    result.duplicates += 1
+                    if duplicates == 'update':
+                        question_id, old_subject = existing[row['content_hash']]
+                        updates.append(dict(row, b_id=question_id))
+                        subjects.add(old_subject)
+                        if question_id is not None and (old_subject or '') != (row['subject'] or ''):
+                            add_tombstone(question_id, old_subject, change_seq)
+                else:
+                    # Later copies within the same import count as duplicates too
+                    existing[row['content_hash']] = (None, row['subject'])
+                    new_rows.append(row)
+            # A question repeated within this batch cannot be updated by id; the first copy wins.
+            updates = [row for row in updates if row['b_id'] is not None]
+            rows = new_rows
+
+        if rows:
+            # executemany needs the same keys in every row
+            for row in rows:
+                for field, default in OPTIONAL_FIELDS.items():
+                    row.setdefault(field, default)
+            inserted = db.session.execute(statement, rows)
+            if return_ids:
+                result.ids.extend(inserted.scalars())
+            result.inserted += len(rows)
+        if updates:
+            # Optional fields (answer, difficulty, topic) are only overwritten in the rows that provide them,
+            # so updates are grouped by the fields they carry, one executemany per group.
+            groups = {}
+            for row in updates:
+                groups.setdefault(tuple(field for field in UPDATED_FIELDS if field in row), []).append(row)
+            for fields, group in groups.items():
+                update_statement = db.update(table).where(table.c.id == db.bindparam('b_id')).values(
+                    {field: db.bindparam(field) for field in fields + ('change_seq',)})
+                db.session.execute(update_statement, group)
+            result.updated += len(updates)
+        subjects.update(row['subject'] for row in rows + updates)
+
+    if subjects:
+        bump_bank_version(*subjects)
+    return result
+
+
+def file_sha256(filepath):
+    """Returns the hex SHA-256 digest of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed PDF questions keyed by the SHA-256 of the uploaded file and
+    PARSER_VERSION, so re-importing a file (under any subject) skips extraction and parsing
+    until the parser changes. A new entry is also the spool ingest_pdf inserts from.
+    Each entry is a gzip'd JSON Lines file: one question per line (without its subject),
+    then a trailer line with the ParseReport. A file's mtime marks its last use, and the
+    least recently used entries are evicted once the folder exceeds PARSE_CACHE_MAX_BYTES.
+    """
+
+    SUFFIX = '.jsonl.gz'
+
+    def entry_path(self, digest):
+        # Entries written by another parser version never match; they age out through evict().
+        return os.path.join(current_app.config['PARSE_CACHE_FOLDER'], f'{digest}.v{PARSER_VERSION}{self.SUFFIX}')
+
+    def load(self, digest, subject, report):
+        """
+        Returns an iterator over the cached questions of digest with the given subject
+        (filling report once exhausted), or None if the file has not been parsed before.
+        """
+        path = self.entry_path(digest)
+        try:
+            os.utime(path) # Mark as recently used
+            f = gzip.open(path, 'rt', encoding='utf-8') # Opened now, so a later eviction cannot cut it short
+        except FileNotFoundError:
+            return None
+        return self._iter_entry(f, subject, report)
+
+    def _iter_entry(self, f, subject, report):
+        with f:
+            for line in f:
+                record = json.loads(line)
+                if 'report' in record:
+                    if report is not None:
+                        report.parsed += record['report']['parsed']
+                        report.skipped.extend(record['report']['skipped'])
+                    continue
+                record['subject'] = subject
+                yield record
+
+    def store(self, digest, subject, questions, report):
+        """
+        Writes every question to a new entry for digest, which only becomes visible once
+        complete, and returns an iterator reading them back with the given subject.
+        report is already filled by the parser, so the trailer is not added to it again.
+        """
+        path = self.entry_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for q_data in questions:
+                    cached = {key: value for key, value in q_data.items() if key != 'subject'}
+                    f.write(json.dumps(cached, ensure_ascii=False) + '\n')
+                f.write(json.dumps({'report': {'parsed': report.parsed, 'skipped': report.skipped}},
+                                   ensure_ascii=False) + '\n')
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        f = gzip.open(path, 'rt', encoding='utf-8') # Before evict(), which may remove the new entry too
+        self.evict()
+        return self._iter_entry(f, subject, None)
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in PARSE_CACHE_MAX_BYTES."""
+        folder = current_app.config['PARSE_CACHE_FOLDER']
+        entries = []
+        for name in os.listdir(folder):
+            if name.endswith(self.SUFFIX):
+                stat = os.stat(os.path.join(folder, name))
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(folder, name)))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= current_app.config['PARSE_CACHE_MAX_BYTES']:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass # Evicted concurrently
+            total -= size
+
+
+parse_cache = ParseCache()
+
+
+def ingest_pdf(filepath, subject, progress=None, report=None):
+    """
+    Extracts and parses the questions of one PDF, then inserts them in a single transaction
+    and records an ImportLog entry. A PDF that was parsed before is read back from the parse
+    cache instead.
+    Questions already in the bank (same content hash, in any subject) count as duplicates and
+    are moved to the given subject, keeping their answer keys, difficulty and topic: importing
+    a paper again under another subject moves its questions there.
+    Returns the BulkInsertResult; parse outcomes are collected in report.
+    """
+    if report is None:
+        report = ParseReport()
+    digest = file_sha256(filepath)
+    parsed_questions = parse_cache.load(digest, subject, report)
+    if parsed_questions is not None:
+        if progress is not None:
+            progress.cache_hit = True
+    else:
+        # Pages are extracted and parsed as a stream into a new parse cache entry, before any
+        # write: SQLite's write lock is then only held while the questions are inserted, not for
+        # the whole extraction. Memory stays bounded by one page, and by one batch of questions
+        # while inserting, regardless of the size of the PDF.
+        pages = iter_pdf_pages(filepath)
+        if progress is not None:
+            pages = progress.track_pages(pages)
+        parsed_questions = iter_parsed_questions(pages, default_subject=subject, report=report)
+        parsed_questions = parse_cache.store(digest, subject, parsed_questions, report)
+    # A PDF has no answer keys (-1); leaving them out keeps those of questions already in the bank.
+    parsed_questions = ({key: value for key, value in q_data.items() if key != 'correct_answer'}
+                        for q_data in parsed_questions)
+    result = bulk_insert_questions(parsed_questions, duplicates='update')
+
+    db.session.add(ImportLog(
+        filename=os.path.basename(filepath),
+        subject=subject,
+        questions_parsed=report.parsed,
+        questions_skipped=len(report.skipped),
+        questions_inserted=result.inserted,
+        duplicates=result.duplicates
+    ))
+    db.session.commit()
+    return result
+
+
+class IngestJob:
+    """Progress of one background PDF upload, reported by /jobs/<id>."""
+
+    def __init__(self, filename, subject):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.subject = subject
+        self.status = 'queued' # queued -> running -> done | failed
+        self.error = None
+        self.pages_processed = 0
+        self.cache_hit = False # Questions came from the parse cache, no extraction needed
+        self.report = ParseReport()
+        self.questions_inserted = 0
+        self.duplicates = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def track_pages(self, pages):
+        for page_text in pages:
+            yield page_text
+            self.pages_processed += 1
+
+    def to_dict(self):
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'subject': self.subject,
+            'status': self.status,
+            'error': self.error,
+            'pages_processed': self.pages_processed,
+            'cache_hit': self.cache_hit,
+            'questions_parsed': self.report.parsed,
+            'questions_skipped': len(self.report.skipped),
+            'skip_reasons': self.report.reason_counts(),
+            'questions_inserted': self.questions_inserted,
+            'duplicates': self.duplicates,
+            'elapsed_seconds': round(elapsed, 3)
+        }
+
+
+ingest_executor = None
+ingest_executor_lock = threading.Lock()
+# Jobs are tracked in the memory of the process that accepted the upload, so /jobs/<id> only
+# finds a job in that process: background uploads (async=1) need a single worker process, or
+# requests routed back to the same one. Synchronous uploads work with any number of workers.
+ingest_jobs = OrderedDict() # job id -> IngestJob, oldest first
+ingest_jobs_lock = threading.Lock()
+
+
+def get_ingest_executor():
+    """Returns the background upload thread pool, starting it on first use."""
+    global ingest_executor
+    with ingest_executor_lock:
+        if ingest_executor is None:
+            ingest_executor = ThreadPoolExecutor(max_workers=current_app.config['INGEST_WORKERS'],
+                                                 thread_name_prefix='ingest')
+        return ingest_executor
+
+
+def submit_ingest_job(filepath, subject):
+    """Queues a PDF for background ingestion and returns its IngestJob right away."""
+    job = IngestJob(os.path.basename(filepath), subject)
+    with ingest_jobs_lock:
+        ingest_jobs[job.id] = job
+        # Forget the oldest finished jobs beyond the configured history
+        finished = [j.id for j in ingest_jobs.values() if j.status in ('done', 'failed')]
+        for job_id in finished[:max(0, len(ingest_jobs) - current_app.config['INGEST_JOB_HISTORY'])]:
+            del ingest_jobs[job_id]
+    get_ingest_executor().submit(run_ingest_job, current_app._get_current_object(), job, filepath)
+    return job
+
+
+def run_ingest_job(app, job, filepath):
+    """Worker body: runs ingest_pdf for a queued job inside its own app context."""
+    with app.app_context():
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            result = ingest_pdf(filepath, job.subject, progress=job, report=job.report)
+            job.questions_inserted = result.inserted
+            job.duplicates = result.duplicates
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+
+@bp.route('/upload_pdf', methods=['POST'])
+def upload_pdf():
+    """
+    Handles PDF file uploads, extracts questions, and saves them to the database.
+    Requires admin login. Assigns a single subject to all questions from the PDF.
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return redirect(url_for('auth.login'))
+    from .admin import render_admin_panel # admin imports this module (through the importer)
+
+    subject_for_pdf = request.form.get('subject_for_pdf', 'General').strip() # Get subject from form
+    if not subject_for_pdf:
+        return render_admin_panel(error="Subject for PDF is required.")
+
+    if 'pdf_file' not in request.files:
+        return render_admin_panel(error="No file part")
+
+    file = request.files['pdf_file']
+    if file.filename == '':
+        return render_admin_panel(error="No selected file")
+
+    filepath = os.path.join(current_app.config['QUIZ_FOLDER'], file.filename)
+    file.save(filepath)
+
+    # Async mode: hand the PDF to the background workers and return the job id right away.
+    if request.form.get('async') or request.args.get('async'):
+        job = submit_ingest_job(filepath, subject_for_pdf)
+        return jsonify({'job_id': job.id, 'status_url': url_for('ingest.job_status', job_id=job.id)}), 202
+
+    try:
+        # Pass the subject provided by the admin for this PDF
+        ingest_pdf(filepath, subject_for_pdf)
+        return redirect(url_for('admin.admin_panel'))
+
+    except Exception as e:
+        # Discard any batches already flushed for this PDF
+        db.session.rollback()
+        # Make sure to remove the uploaded file if processing fails to avoid clutter
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return render_admin_panel(error=f"Failed to process PDF: {e}")
+
+@bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Reports the progress of a background PDF upload. Requires admin login.
+    Only the worker process that accepted the upload knows the job (see ingest_jobs).
+    """
+    if 'username' not in session or session['username'] != 'admin':
+        return jsonify({'error': 'Admin login required'}), 403
+
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found (jobs are only known to the worker process that accepted '
+                                 'the upload)'}), 404
+    return jsonify(job.to_dict())
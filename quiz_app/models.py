@@ -0,0 +1,141 @@
+"""Database models."""
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+from .extensions import db
+
+# User model for authentication
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(150), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+
+# Updated Question model to include a 'subject'
+class Question(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    # Text rather than VARCHAR(n): SQLite never enforced the lengths, PostgreSQL would reject long PDF questions
+    question_text = db.Column(db.Text, nullable=False)
+    option1 = db.Column(db.Text, nullable=False)
+    option2 = db.Column(db.Text, nullable=False)
+    option3 = db.Column(db.Text, nullable=False)
+    option4 = db.Column(db.Text, nullable=False)
+    correct_answer = db.Column(db.Integer, nullable=False)  # 0 to 3, or -1 if not set
+    subject = db.Column(db.String(100), nullable=True) # New column for subject
+    # SHA-256 of the normalized question and options, used to detect re-imported questions
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
+    difficulty = db.Column(db.Integer, nullable=True) # 1 (easy) to 3 (hard), or None if not rated
+    topic = db.Column(db.String(100), nullable=True) # e.g. 'Kinematics'; used to weight generated papers
+    change_seq = db.Column(db.BigInteger, nullable=False) # Set from next_change_seq() on every insert and update
+
+    __table_args__ = (
+        db.Index('ix_question_subject_id', 'subject', 'id'), # Subject filters and keyset paging within a subject
+        db.Index('ix_question_change_seq', 'change_seq', 'id'), # /api/questions/changes
+    )
+
+# SubjectConfig model is no longer used for PDF uploads in this flow,
+# but kept here if you still use it for other purposes (e.g., manual question adds).
+# If not, you can remove this class and any 'SubjectConfig.query.all()' calls
+# where it's no longer relevant.
+class SubjectConfig(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    subject_name = db.Column(db.String(100), unique=True, nullable=False)
+    start_q_num = db.Column(db.Integer, nullable=False)
+    end_q_num = db.Column(db.Integer, nullable=False)
+
+def utcnow():
+    """Current UTC time as a naive datetime, the way SQLite hands DateTime columns back."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# One quiz taken by a user; scored on the server when submitted (or when its time is up)
+class Attempt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    subjects = db.Column(db.Text, nullable=False, default='[]') # JSON list of subjects, empty for all
+    started_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    submitted_at = db.Column(db.DateTime, nullable=True)
+    score = db.Column(db.Integer, nullable=True)
+    total = db.Column(db.Integer, nullable=True)
+    seed = db.Column(db.BigInteger, nullable=True) # Seed the paper was generated with
+    # JSON list of [question id, option order] for generated papers; None means every question in subjects
+    paper = db.Column(db.Text, nullable=True)
+
+    @property
+    def deadline(self):
+        return self.started_at + timedelta(seconds=current_app.config['QUIZ_DURATION_SECONDS'])
+
+# Latest state of one question within an attempt
+class AttemptAnswer(db.Model):
+    attempt_id = db.Column(db.Integer, db.ForeignKey('attempt.id', ondelete='CASCADE'), primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id', ondelete='CASCADE'), primary_key=True, index=True)
+    selected = db.Column(db.Integer, nullable=True) # 0 to 3, or None if not answered
+    marked = db.Column(db.Boolean, nullable=False, default=False) # Marked for review
+    updated_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+
+# One row per PDF upload, shown on the admin panel
+class ImportLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    questions_parsed = db.Column(db.Integer, nullable=False, default=0)
+    questions_skipped = db.Column(db.Integer, nullable=False, default=0) # Chunks the parser could not use
+    questions_inserted = db.Column(db.Integer, nullable=False, default=0)
+    duplicates = db.Column(db.Integer, nullable=False, default=0) # Questions already in the bank
+
+# One row per subject, bumped in the same transaction as every write to that subject's questions.
+# Questions without a subject are tracked under the empty string.
+class SubjectVersion(db.Model):
+    subject = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+def bump_bank_version(*subjects):
+    """
+    Increments the version of every given subject inside the current transaction,
+    so cached snapshots of those subjects (and only those) are rebuilt on next read.
+    Must be called before db.session.commit() of the write it describes.
+    """
+    for subject in {s or '' for s in subjects}:
+        updated = db.session.execute(
+            db.update(SubjectVersion)
+            .where(SubjectVersion.subject == subject)
+            .values(version=SubjectVersion.version + 1)
+        ).rowcount
+        if not updated:
+            db.session.add(SubjectVersion(subject=subject, version=1))
+
+
+# Single-row counter behind Question.change_seq and QuestionTombstone.change_seq.
+# Writers increment it inside their transaction, which keeps the row (on SQLite the database)
+# locked until they commit, so sequence numbers become visible in order: once a reader sees
+# value N, every change numbered N or lower is committed.
+class ChangeSequence(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+# A question leaving a subject, because it was deleted or moved to another subject.
+# Questions without a subject are tracked under the empty string.
+class QuestionTombstone(db.Model):
+    question_id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(100), primary_key=True)
+    change_seq = db.Column(db.BigInteger, nullable=False, index=True)
+
+
+def next_change_seq():
+    """
+    Allocates the change sequence number for the writes of the current transaction.
+    Every question inserted or updated gets it as change_seq; the caller commits.
+    """
+    db.session.execute(db.update(ChangeSequence).where(ChangeSequence.id == 1).values(value=ChangeSequence.value + 1))
+    return db.session.execute(db.select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar_one()
+
+
+def current_change_seq():
+    """The highest change sequence number that is committed (0 if nothing changed yet)."""
+    return db.session.execute(db.select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar() or 0
+
+
+def add_tombstone(question_id, subject, change_seq):
+    """Records that a question left a subject at change_seq, replacing an older record of the same."""
+    db.session.merge(QuestionTombstone(question_id=question_id, subject=subject or '', change_seq=change_seq))
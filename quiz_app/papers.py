@@ -0,0 +1,300 @@
+"""
+Generated papers: N random questions per subject, optionally weighted by difficulty or topic,
+with shuffled options and a seed per attempt.
+
+Sampling never sorts the bank (no ORDER BY RANDOM()): random ids are drawn from each stratum's
+id range and looked up by primary key, so the database work grows with the paper, not the bank.
+"""
+import json
+import math
+import random
+import secrets
+import threading
+
+from flask import current_app
+
+from .extensions import db
+from .models import Question
+from .question_bank import question_bank
+from .read_model import iter_tuples, select_questions
+
+DIFFICULTY_LEVELS = {'easy': 1, 'medium': 2, 'hard': 3}
+WEIGHT_DIMENSIONS = ('difficulty', 'topic')
+
+
+def subject_clause(subject):
+    """Question filter for one subject; '' stands for questions without a subject."""
+    return Question.subject == subject if subject else Question.subject.is_(None)
+
+def column_clause(column, value):
+    return column == value if value is not None else column.is_(None)
+
+def sort_key(value):
+    """Orders stratum keys that may be None, so a seed always yields the same paper."""
+    return (value is None, value if value is not None else 0)
+
+
+def load_strata(subject):
+    """
+    Returns one subject's (difficulty, topic) strata as dicts with their id range and size.
+    One GROUP BY over the subject; cached per subject version by PaperStrataCache.
+    """
+    rows = db.session.execute(
+        db.select(Question.difficulty, Question.topic, db.func.min(Question.id),
+                  db.func.max(Question.id), db.func.count())
+        .where(subject_clause(subject))
+        .group_by(Question.difficulty, Question.topic)
+    ).all()
+    return [{'difficulty': difficulty, 'topic': topic, 'min_id': min_id, 'max_id': max_id, 'count': count}
+            for difficulty, topic, min_id, max_id, count in rows]
+
+
+class PaperStrataCache:
+    """
+    In-process cache of per-subject strata, reused for as long as the subject's version is
+    unchanged (like the question bank snapshots), so generating a paper does not re-count the bank.
+    """
+
+    def __init__(self):
+        self._strata = {}
+        self._lock = threading.Lock()
+
+    def strata(self, subject, version):
+        cached = self._strata.get(subject)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._lock:
+            cached = self._strata.get(subject)
+            if cached is None or cached[0] != version:
+                cached = (version, load_strata(subject))
+                self._strata[subject] = cached
+            return cached[1]
+
+    def clear(self):
+        """Forgets every subject, e.g. after switching to another database with the same versions."""
+        with self._lock:
+            self._strata.clear()
+
+
+paper_strata = PaperStrataCache()
+
+
+def parse_paper_spec(payload):
+    """
+    Validates the 'paper' object of POST /api/attempts:
+      per_subject     - questions per subject (default PAPER_QUESTIONS_PER_SUBJECT)
+      questions       - optional {subject: count} overriding per_subject for some subjects
+      weight_by       - optional 'difficulty' or 'topic'
+      weights         - {difficulty ('easy', 'medium', 'hard' or 1-3) or topic: relative weight}
+      shuffle_options - shuffle the options of every question (default true)
+    Returns (spec, error).
+    """
+    if not isinstance(payload, dict):
+        return None, "'paper' must be a JSON object."
+    limit = current_app.config['PAPER_MAX_QUESTIONS_PER_SUBJECT']
+
+    def valid_count(value):
+        return isinstance(value, int) and not isinstance(value, bool) and 0 < value <= limit
+
+    per_subject = payload.get('per_subject', current_app.config['PAPER_QUESTIONS_PER_SUBJECT'])
+    questions = payload.get('questions', {})
+    if not valid_count(per_subject) or not isinstance(questions, dict) \
+            or not all(valid_count(count) for count in questions.values()):
+        return None, f"Question counts must be integers from 1 to {limit}."
+
+    weight_by = payload.get('weight_by')
+    weights = {}
+    if weight_by is not None:
+        if weight_by not in WEIGHT_DIMENSIONS:
+            return None, "weight_by must be 'difficulty' or 'topic'."
+        raw_weights = payload.get('weights')
+        if not isinstance(raw_weights, dict) or not raw_weights:
+            return None, "weights must be a non-empty object."
+        for key, weight in raw_weights.items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+                return None, "Weights must be non-negative numbers."
+            if weight_by == 'difficulty':
+                key = DIFFICULTY_LEVELS.get(key, int(key) if key in ('1', '2', '3') else None)
+                if key is None:
+                    return None, "Difficulty weights take 'easy', 'medium', 'hard' (or 1-3)."
+            weights[key] = float(weight)
+        if not any(weights.values()):
+            return None, "At least one weight must be positive."
+
+    return {
+        'per_subject': per_subject,
+        'questions': questions,
+        'weight_by': weight_by,
+        'weights': weights,
+        'shuffle_options': bool(payload.get('shuffle_options', True))
+    }, None
+
+
+def allocate(total, weights, available):
+    """
+    Splits total questions across strata in proportion to weights (largest remainder), never giving
+    a stratum more questions than it has; what a small stratum cannot supply goes to the others.
+    Returns {key: count}; the counts add up to less than total only if the strata run out.
+    """
+    counts = {key: 0 for key in weights}
+    remaining = total
+    open_keys = [key for key in sorted(weights, key=sort_key) if weights[key] > 0 and available.get(key, 0) > 0]
+    while remaining > 0 and open_keys:
+        weight_sum = sum(weights[key] for key in open_keys)
+        shares = {key: remaining * weights[key] / weight_sum for key in open_keys}
+        granted = {key: min(int(shares[key]), available[key] - counts[key]) for key in open_keys}
+        leftover = remaining - sum(granted.values())
+        for key in sorted(open_keys, key=lambda key: shares[key] - int(shares[key]), reverse=True):
+            if leftover <= 0:
+                break
+            if counts[key] + granted[key] < available[key]:
+                granted[key] += 1
+                leftover -= 1
+        for key, count in granted.items():
+            counts[key] += count
+        remaining -= sum(granted.values())
+        open_keys = [key for key in open_keys if counts[key] < available[key]]
+    return counts
+
+
+def sample_ids(rng, clauses, lo, hi, available, k):
+    """
+    Draws up to k distinct random ids of questions matching clauses from the id range [lo, hi].
+
+    Candidate ids are drawn uniformly from the range and kept if a matching question has that id,
+    so every question is equally likely; each round is one primary-key lookup of about k / density
+    candidates (at most PAPER_SAMPLE_BATCH). If the range is too sparse for that, the remaining
+    questions are drawn uniformly from the matching ids not picked yet, fetched in one query
+    (only ids, and only for ranges where matches are sparse).
+    """
+    if k >= available:
+        ids = list(db.session.execute(
+            db.select(Question.id).where(*clauses).order_by(Question.id)).scalars())
+        rng.shuffle(ids)
+        return ids
+
+    picked, seen, tried = [], set(), set()
+    span = hi - lo + 1
+    batch = current_app.config['PAPER_SAMPLE_BATCH']
+    for _ in range(current_app.config['PAPER_SAMPLE_ROUNDS']):
+        need = k - len(picked)
+        if need <= 0 or len(tried) >= span:
+            break
+        size = min(batch, span, math.ceil(need * span / available * 1.25) + 8)
+        candidates = [c for c in rng.sample(range(lo, hi + 1), size) if c not in tried]
+        tried.update(candidates)
+        hits = set(db.session.execute(
+            db.select(Question.id).where(Question.id.in_(candidates), *clauses)).scalars())
+        for candidate in candidates:
+            if candidate in hits and candidate not in seen and len(picked) < k:
+                picked.append(candidate)
+                seen.add(candidate)
+
+    if len(picked) < k:
+        # Too sparse for random ids: sample the rest from the matching ids themselves, loaded in
+        # one query with the picked ones left out here rather than in an ever-growing NOT IN.
+        rest = [question_id for question_id in db.session.execute(
+            db.select(Question.id).where(*clauses).order_by(Question.id)).scalars() if question_id not in seen]
+        picked.extend(rng.sample(rest, min(k - len(picked), len(rest))))
+    return picked
+
+
+def sample_subject(rng, subject, strata, n, spec):
+    """Returns up to n random question ids of one subject, split across strata as spec asks."""
+    dimension = spec['weight_by']
+    groups = {}
+    for stratum in strata:
+        groups.setdefault(stratum[dimension] if dimension else None, []).append(stratum)
+    available = {key: sum(s['count'] for s in group) for key, group in groups.items()}
+
+    if dimension:
+        counts = allocate(n, spec['weights'], available)
+        # Strata without weight only fill what the weighted ones could not supply
+        shortfall = n - sum(counts.values())
+        if shortfall > 0:
+            spare = {key: count - counts.get(key, 0) for key, count in available.items()}
+            for key, count in allocate(shortfall, spare, spare).items():
+                counts[key] = counts.get(key, 0) + count
+    else:
+        counts = {None: min(n, available.get(None, 0))}
+
+    ids = []
+    for key in sorted(counts, key=sort_key):
+        if not counts[key] or key not in groups:
+            continue
+        clauses = [subject_clause(subject)]
+        if dimension:
+            clauses.append(column_clause(getattr(Question, dimension), key))
+        group = groups[key]
+        ids.extend(sample_ids(rng, clauses, min(s['min_id'] for s in group), max(s['max_id'] for s in group),
+                              available[key], counts[key]))
+    rng.shuffle(ids)
+    return ids
+
+
+def new_paper_seed():
+    """A random seed that survives the trip through JavaScript numbers (53 bits)."""
+    return secrets.randbits(53)
+
+def generate_paper(subjects, spec, seed):
+    """
+    Generates a paper for the given subjects (every subject if empty) from seed.
+    Returns a list of [question id, option order], grouped by subject in the requested order.
+    The same seed gives the same paper for as long as the subjects' questions are unchanged.
+    """
+    rng = random.Random(seed)
+    versions = question_bank.versions(subjects)
+    paper = []
+    for subject in subjects or sorted(versions):
+        if subject not in versions:
+            continue
+        n = spec['questions'].get(subject, spec['per_subject'])
+        for question_id in sample_subject(rng, subject, paper_strata.strata(subject, versions[subject]), n, spec):
+            order = [0, 1, 2, 3]
+            if spec['shuffle_options']:
+                rng.shuffle(order)
+            paper.append([question_id, order])
+    return paper
+
+
+def paper_questions(paper):
+    """Loads the questions of a paper in paper order, with their options in the paper's order."""
+    questions = {}
+    question_ids = [question_id for question_id, _ in paper]
+    batch = current_app.config['PAPER_SAMPLE_BATCH']
+    for start in range(0, len(question_ids), batch):
+        for values in iter_tuples(select_questions().where(Question.id.in_(question_ids[start:start + batch]))):
+            questions[values[0]] = values
+    rows = []
+    for question_id, order in paper:
+        values = questions.get(question_id)
+        if values is None: # Deleted since the paper was generated
+            continue
+        _, text, *options, subject = values
+        rows.append({
+            'id': question_id,
+            'q': text,
+            'options': [options[i] for i in order],
+            'subject': subject
+        })
+    return rows
+
+
+def to_bank_answers(attempt, rows):
+    """
+    Maps answers given against a generated paper's shuffled options back to the stored option
+    order, so the answer key applies unchanged, and drops questions that are not on the paper.
+    Rows of attempts without a generated paper are returned as they are.
+    """
+    if attempt.paper is None:
+        return rows
+    orders = {question_id: order for question_id, order in json.loads(attempt.paper)}
+    mapped = []
+    for row in rows:
+        order = orders.get(row['question_id'])
+        if order is None:
+            continue
+        if row['selected'] is not None:
+            row = dict(row, selected=order[row['selected']])
+        mapped.append(row)
+    return mapped
@@ -0,0 +1,141 @@
+"""Single-pass tokenizer turning extracted PDF text into question dicts."""
+import re
+
+# Bump whenever a change could parse the same text differently (tokenizer, question dicts or
+# skip reports); it is part of every parse cache entry name, so older parses are not reused.
+PARSER_VERSION = 2
+
+# A question starts on a new line with its number, a dot and a space (e.g., "\n 1. ").
+# An option marker is a letter A-D followed by a dot (e.g., "A."), anywhere in the text.
+# Both are recognised by one compiled pattern, so each page is tokenized in a single scan.
+# The leading character class lets the regex engine skip quickly to candidate positions.
+QUESTION_TOKEN_RE = re.compile(r'[\nA-D](?:(?<=\n)\s*(?P<number>\d+)\.\s|(?<=(?P<letter>[A-D]))\.)')
+NON_SPACE_RE = re.compile(r'\S')
+
+
+class ParseReport:
+    """Counts parsed questions and records why others were skipped, instead of printing them."""
+
+    def __init__(self):
+        self.parsed = 0
+        self.skipped = [] # {'question': number, 'reason': ..., plus reason-specific details}
+
+    def skip(self, q_num, reason, **details):
+        self.skipped.append({'question': q_num, 'reason': reason, **details})
+
+    def reason_counts(self):
+        counts = {}
+        for entry in self.skipped:
+            counts[entry['reason']] = counts.get(entry['reason'], 0) + 1
+        return counts
+
+    def to_dict(self):
+        return {'parsed': self.parsed, 'skipped': len(self.skipped),
+                'skip_reasons': self.reason_counts(), 'skipped_questions': self.skipped}
+
+
+def build_question(text, q_num, start, end, markers, subject, report):
+    """
+    Turns the tokens of one question, text[start:end], into a question dict,
+    or records a skip reason in the report and returns None.
+    Sets correct_answer to -1, as answers will be manually set by the admin.
+    """
+    # The question text runs up to the first option marker that begins a line.
+    first_char = NON_SPACE_RE.search(text, start, end)
+    content_start = first_char.start() if first_char else end
+    first_option = None
+    for i, marker in enumerate(markers):
+        if marker.start() == content_start or text[marker.start() - 1] == '\n':
+            first_option = i
+            break
+    if first_option is None:
+        report.skip(q_num, 'no_options')
+        return None
+
+    question_text = text[content_start:markers[first_option].start()].strip()
+
+    # Every marker from there on ends the previous option; a repeated letter keeps the last text.
+    # A marker with no text of its own takes the next marker and its text as its option text,
+    # and a trailing marker with no text is ignored.
+    options = {}
+    option_markers = markers[first_option:]
+    boundaries = [marker.start() for marker in option_markers[1:]] + [end]
+    i = 0
+    while i < len(option_markers):
+        marker = option_markers[i]
+        option_text = text[marker.end():boundaries[i]].strip()
+        if not option_text:
+            if i + 1 == len(option_markers):
+                break
+            i += 1
+            option_text = text[option_markers[i].start():boundaries[i]].strip()
+        options[marker.group('letter')] = option_text
+        i += 1
+
+    # Ensure we have exactly 4 options (A, B, C, D). If not, it's a parsing error.
+    final_options = [options.get(letter, '') for letter in 'ABCD']
+    if not all(final_options):
+        report.skip(q_num, 'incomplete_options', question_text=question_text, options=final_options)
+        return None
+
+    report.parsed += 1
+    return {
+        'question_text': question_text,
+        'option1': final_options[0],
+        'option2': final_options[1],
+        'option3': final_options[2],
+        'option4': final_options[3],
+        'correct_answer': -1,
+        'subject': subject
+    }
+
+def iter_parsed_questions(pages, default_subject='General', report=None):
+    """
+    Lazily parses questions from a stream of page texts with a single-pass tokenizer.
+    Assigns the provided default_subject to all questions from this PDF.
+    A question is emitted once the next question number is seen. The text from the last
+    question number onwards is carried over (and re-tokenized) with the next page, because a
+    question (or its number) may continue across a page boundary. Any preamble before the
+    first question is dropped.
+    Skipped questions are recorded in report (a ParseReport), if given.
+    """
+    if report is None:
+        report = ParseReport()
+    carry = ""
+    buffer = ""
+    current = None # (number, content start, option markers) of the open question
+    for page_text in pages:
+        buffer = carry + page_text
+        current = None
+        for token in QUESTION_TOKEN_RE.finditer(buffer):
+            if token.lastgroup == 'letter':
+                if current is not None:
+                    current[2].append(token)
+                continue
+            if current is not None:
+                question = build_question(buffer, current[0], current[1], token.start(), current[2],
+                                          default_subject, report)
+                if question is not None:
+                    yield question
+            current = (int(token.group('number')), token.end(), [])
+            carry_start = token.start()
+
+        if current is not None:
+            carry = buffer[carry_start:]
+        else:
+            # Still in the preamble; only keep what could begin a question number.
+            carry = buffer[buffer.rfind('\n'):] if '\n' in buffer else buffer
+
+    # The last open question ends with the document.
+    if current is not None:
+        question = build_question(buffer, current[0], current[1], len(buffer), current[2], default_subject, report)
+        if question is not None:
+            yield question
+
+def process_pdf_content(text, default_subject='General', report=None):
+    """
+    Processes the raw text extracted from a PDF to parse questions and their options.
+    Assigns the provided default_subject to all questions from this PDF.
+    Sets correct_answer to -1, as answers will be manually set by the admin.
+    """
+    return list(iter_parsed_questions([text], default_subject, report))
@@ -0,0 +1,57 @@
+"""
+PDF text extraction. Large documents are split into page ranges that a process pool
+extracts in parallel.
+"""
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+
+def extract_page_range(filepath, start, stop):
+    """Extraction worker: reopens the PDF by path and returns the text of pages [start, stop)."""
+    import fitz  # PyMuPDF
+    with fitz.open(filepath) as doc:
+        return [doc[i].get_text() + "\n" for i in range(start, stop)]
+
+pdf_extract_pool = None
+pdf_extract_pool_lock = threading.Lock()
+
+def get_pdf_extract_pool():
+    """Returns the shared extraction process pool, starting it on first use."""
+    global pdf_extract_pool
+    with pdf_extract_pool_lock:
+        if pdf_extract_pool is None:
+            # 'spawn' because forking a multi-threaded web server is unsafe
+            pdf_extract_pool = ProcessPoolExecutor(max_workers=current_app.config['PDF_EXTRACT_WORKERS'],
+                                                   mp_context=multiprocessing.get_context('spawn'))
+        return pdf_extract_pool
+
+def iter_pdf_pages(filepath):
+    """
+    Yields the text of a PDF one page at a time, in page order.
+    Page ranges are extracted in parallel by the process pool; only a few ranges per worker are
+    in flight at once, so the whole document is never held in memory.
+    """
+    # PyMuPDF is imported on first use, so processes that never ingest a PDF do not load it
+    import fitz  # PyMuPDF
+    workers = current_app.config['PDF_EXTRACT_WORKERS']
+    pages_per_task = current_app.config['PDF_EXTRACT_PAGES_PER_TASK']
+    with fitz.open(filepath) as doc:
+        page_count = doc.page_count
+        if workers <= 1 or page_count <= pages_per_task:
+            for page in doc:
+                yield page.get_text() + "\n"
+            return
+
+    pool = get_pdf_extract_pool()
+    ranges = ((start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task))
+    pending = deque()
+    for start, stop in ranges:
+        pending.append(pool.submit(extract_page_range, filepath, start, stop))
+        if len(pending) >= workers * 2:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
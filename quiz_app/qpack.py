@@ -0,0 +1,72 @@
+"""
+qpack: compact binary encoding of /api/questions pages, for clients on slow or metered connections.
+
+Clients ask for it with `Accept: application/vnd.jee-quiz.qpack`; static/js/qpack.js decodes it.
+Every integer is an unsigned LEB128 varint. A page is laid out as:
+
+    magic            b'QPK1'
+    next_after_id    0 for the last page, else the cursor + 1
+    subjects         count, then each subject as its UTF-8 byte length and bytes
+    string table     count, the length of each string in UTF-16 code units, the byte length of
+                     the UTF-8 blob, then the blob: every question text and option of the page,
+                     once, in order of first use
+    questions        count, then per question: id delta from the previous question, subject
+                     (0 for none, else 1 + its position in the subject list), and references to
+                     its text and four options: 0 for the next string of the table not used yet,
+                     n > 0 for the already used string at index n - 1
+
+Lengths are in UTF-16 code units so a decoder can turn the whole blob into one string and slice it.
+With first-use order most references are a single 0 byte and the id deltas are mostly 1, so the
+question records add next to nothing once the page is gzipped.
+"""
+MIMETYPE = 'application/vnd.jee-quiz.qpack'
+MAGIC = b'QPK1'
+
+
+def encode_varint(value, out):
+    """Appends value as an unsigned LEB128 varint to the bytearray out."""
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def utf16_length(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def encode_page(rows, next_after_id):
+    """Encodes question rows (the shape served by /api/questions, ordered by id) as one qpack page."""
+    subjects = list(dict.fromkeys(row['subject'] for row in rows if row['subject']))
+    subject_index = {subject: i + 1 for i, subject in enumerate(subjects)}
+
+    strings, index, records = [], {}, bytearray()
+    previous_id = 0
+    for row in rows:
+        encode_varint(row['id'] - previous_id, records)
+        previous_id = row['id']
+        encode_varint(subject_index.get(row['subject'], 0), records)
+        for text in (row['q'], *row['options']):
+            if text in index:
+                encode_varint(index[text] + 1, records)
+            else:
+                index[text] = len(strings)
+                strings.append(text)
+                records.append(0)
+
+    out = bytearray(MAGIC)
+    encode_varint(0 if next_after_id is None else next_after_id + 1, out)
+    encode_varint(len(subjects), out)
+    for subject in subjects:
+        encoded = subject.encode('utf-8')
+        encode_varint(len(encoded), out)
+        out += encoded
+    encode_varint(len(strings), out)
+    for text in strings:
+        encode_varint(utf16_length(text), out)
+    blob = ''.join(strings).encode('utf-8')
+    encode_varint(len(blob), out)
+    out += blob
+    encode_varint(len(rows), out)
+    out += records
+    return bytes(out)
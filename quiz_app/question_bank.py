@@ -0,0 +1,239 @@
+"""
+In-memory snapshots of the question bank and the encoded /api/questions pages built from them.
+"""
+import bisect
+import gzip
+import hashlib
+import heapq
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from . import qpack
+from .extensions import db
+from .models import Question, QuestionTombstone, SubjectVersion
+from .read_model import iter_question_rows, iter_tuples, question_row, select_questions
+
+try:
+    import brotli  # Optional: enables 'br' responses from /api/questions
+except ImportError:
+    brotli = None
+
+
+# Helper function to clean text, used to normalize questions before hashing them
+def clean_text(text):
+    """
+    Cleans and normalizes text by removing extra whitespace,
+    converting to lowercase, and handling specific characters.
+    """
+    if text is None:
+        return ""
+    text = text.replace('\xa0', ' ').strip().lower()
+    text = re.sub(r'\s+', ' ', text) # Replace multiple spaces with a single space
+    text = text.replace('→', ' ').replace('->', ' ') # Handle arrow characters
+    return text
+
+
+def question_content_hash(q_data):
+    """
+    Returns the content hash of a question (a dict or row mapping with question_text and
+    option1-option4). Text is normalized with clean_text, so whitespace and case
+    differences between two extractions of the same paper do not matter.
+    """
+    parts = [clean_text(q_data[key]) for key in ('question_text', 'option1', 'option2', 'option3', 'option4')]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+# One encoder for every item (json.dumps with options builds a new encoder per call)
+ITEM_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+class SubjectSnapshot:
+    """Serialized questions of one subject at one version, ordered by id."""
+
+    def __init__(self, version, rows):
+        """rows may be a generator: each row is encoded as it arrives, in a single pass."""
+        self.version = version
+        self.rows, self.ids, self.items = [], [], []
+        for row in rows:
+            self.rows.append(row)
+            self.ids.append(row['id'])
+            # Each question is encoded once; pages are assembled by joining these bytes.
+            self.items.append(ITEM_ENCODER.encode(row).encode('utf-8'))
+
+
+class QuestionBankCache:
+    """
+    In-process cache of per-subject question snapshots.
+    A snapshot is reused for as long as its subject's version in the database is unchanged,
+    so reads cost one small version lookup instead of loading and serializing the questions.
+    """
+
+    def __init__(self):
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._responses = OrderedDict()
+        self._responses_lock = threading.Lock()
+        self._compress_locks = {} # (response key, encoding) -> lock held while compressing that body
+
+    def versions(self, subjects=None):
+        """Returns {subject: version} for the requested subjects (every subject if None/empty)."""
+        query = db.select(SubjectVersion.subject, SubjectVersion.version)
+        if subjects:
+            query = query.where(SubjectVersion.subject.in_(subjects))
+        return dict(db.session.execute(query).all())
+
+    def snapshot(self, subject, version):
+        snap = self._snapshots.get(subject)
+        if snap is not None and snap.version == version:
+            return snap
+        # Only one thread rebuilds; the others wait and reuse its result.
+        with self._lock:
+            snap = self._snapshots.get(subject)
+            if snap is None or snap.version != version:
+                snap = SubjectSnapshot(version, load_subject_rows(subject))
+                self._snapshots[subject] = snap
+            return snap
+
+    def snapshots(self, versions):
+        return [self.snapshot(subject, version) for subject, version in sorted(versions.items())]
+
+    def count(self, subjects=None):
+        return sum(len(snap.ids) for snap in self.snapshots(self.versions(subjects)))
+
+    def page(self, versions, after_id=0, limit=100, field='items'):
+        """
+        Returns (entries, next_after_id) for one keyset page across the subjects in versions,
+        where entries are the snapshots' encoded 'items' or their 'rows'.
+        """
+        streams = []
+        for snap in self.snapshots(versions):
+            start = bisect.bisect_right(snap.ids, after_id)
+            streams.append(zip(snap.ids[start:start + limit + 1], getattr(snap, field)[start:start + limit + 1]))
+        # Fetch one extra item to know whether another page follows.
+        merged = list(heapq.merge(*streams, key=lambda pair: pair[0]))[:limit + 1]
+        has_more = len(merged) > limit
+        merged = merged[:limit]
+        next_after_id = merged[-1][0] if has_more else None
+        return [item for _, item in merged], next_after_id
+
+    def page_body(self, versions, after_id, limit, encoding='identity', fmt='json'):
+        """
+        Returns the /api/questions body for one page in the given format ('json' or 'qpack')
+        and content-coding. Each body is built and compressed once per combination of subject
+        versions, then served from memory until those versions change or it is evicted.
+        """
+        key = (fmt, tuple(sorted(versions.items())), after_id, limit)
+        with self._responses_lock:
+            bodies = self._responses.get(key)
+            if bodies is not None:
+                self._responses.move_to_end(key)
+        if bodies is None:
+            if fmt == 'qpack':
+                rows, next_after_id = self.page(versions, after_id, limit, field='rows')
+                bodies = {'identity': qpack.encode_page(rows, next_after_id)}
+            else:
+                items, next_after_id = self.page(versions, after_id, limit)
+                bodies = {'identity': b'{"questions":[' + b','.join(items) + b'],"next_after_id":'
+                                      + json.dumps(next_after_id).encode() + b'}'}
+            with self._responses_lock:
+                self._responses[key] = bodies
+                while len(self._responses) > current_app.config['QUESTIONS_RESPONSE_CACHE_SIZE']:
+                    self._responses.popitem(last=False)
+        if encoding not in bodies:
+            # Compress once even when many clients miss at the same time (e.g. exam start); only
+            # misses for the same body and encoding wait for each other.
+            with self._responses_lock:
+                lock = self._compress_locks.setdefault((key, encoding), threading.Lock())
+            with lock:
+                if encoding not in bodies:
+                    bodies[encoding] = compress_body(bodies['identity'], encoding)
+            with self._responses_lock:
+                self._compress_locks.pop((key, encoding), None)
+        return bodies[encoding]
+
+
+def compress_body(body, encoding):
+    """Compresses a response body for the given content-coding ('gzip' or 'br')."""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(body, quality=11)
+    return body
+
+
+def negotiate_encoding():
+    """Picks the best precompressed content-coding the client accepts."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return 'identity'
+
+
+def negotiate_format():
+    """Picks 'qpack' for clients that prefer it in Accept, else 'json'."""
+    best = request.accept_mimetypes.best_match(['application/json', qpack.MIMETYPE])
+    return 'qpack' if best == qpack.MIMETYPE else 'json'
+
+
+def question_bank_etag(versions, after_id, limit):
+    """Strong ETag for a page of /api/questions, derived from the versions of the subjects it covers."""
+    key = repr((sorted(versions.items()), after_id, limit)).encode()
+    return 'qb-' + hashlib.sha1(key).hexdigest()[:20]
+
+
+def load_subject_rows(subject):
+    """Streams one subject's questions, ordered by id, in the shape served by /api/questions."""
+    clause = Question.subject == subject if subject else Question.subject.is_(None)
+    return iter_question_rows(select_questions().where(clause).order_by(Question.id))
+
+
+# Position of a change in the stream read by /api/questions/changes: changes are ordered by
+# (change_seq, kind, id), with removals (kind 0) before the questions (kind 1) of the same number.
+REMOVAL, QUESTION = 0, 1
+AFTER_SEQ = 2 # As a cursor kind: past every change numbered change_seq
+
+
+def after_cursor(seq_column, id_column, kind, cursor):
+    """Filter for the changes of one kind that come after cursor, a (change_seq, kind, id) tuple."""
+    seq, cursor_kind, cursor_id = cursor
+    if kind == cursor_kind:
+        same_seq = id_column > cursor_id
+    else:
+        same_seq = db.true() if kind > cursor_kind else db.false()
+    return db.or_(seq_column > seq, db.and_(seq_column == seq, same_seq))
+
+
+def question_changes(subjects, cursor, upper, limit):
+    """
+    Returns (removed ids, question rows, next cursor) for up to limit changes after cursor and
+    numbered at most upper, in the given subjects (every subject if empty). The next cursor is
+    None once the changes up to upper are exhausted. Both lookups walk an index on change_seq,
+    so the cost follows the number of changes, not the size of the bank.
+    """
+    questions = select_questions(Question.change_seq).where(
+        after_cursor(Question.change_seq, Question.id, QUESTION, cursor), Question.change_seq <= upper)
+    tombstones = db.select(QuestionTombstone.change_seq, QuestionTombstone.question_id).where(
+        after_cursor(QuestionTombstone.change_seq, QuestionTombstone.question_id, REMOVAL, cursor),
+        QuestionTombstone.change_seq <= upper)
+    if subjects:
+        questions = questions.where(Question.subject.in_(subjects))
+        tombstones = tombstones.where(QuestionTombstone.subject.in_(subjects))
+
+    changes = [((seq, REMOVAL, question_id), None) for seq, question_id in db.session.execute(
+        tombstones.order_by(QuestionTombstone.change_seq, QuestionTombstone.question_id).limit(limit + 1))]
+    changes += [((values[7], QUESTION, values[0]), values[:7]) for values in
+                iter_tuples(questions.order_by(Question.change_seq, Question.id).limit(limit + 1))]
+    changes.sort(key=lambda change: change[0])
+    next_cursor = changes[limit - 1][0] if len(changes) > limit else None
+    changes = changes[:limit]
+    removed = [key[2] for key, values in changes if values is None]
+    return removed, [question_row(values) for _, values in changes if values is not None], next_cursor
+
+
+question_bank = QuestionBankCache()
@@ -0,0 +1,253 @@
+"""Quiz pages, the question API and the attempts API (blueprint 'quiz')."""
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+from flask import (Blueprint, current_app, jsonify, redirect, render_template, request, send_from_directory, session,
+                   url_for)
+
+from .attempts import (answer_buffer, current_user, get_user_attempt, parse_answer_deltas, save_answers,
+                       score_attempt)
+from .extensions import db
+from .models import Attempt, current_change_seq, utcnow
+from .papers import generate_paper, new_paper_seed, paper_questions, parse_paper_spec, to_bank_answers
+from .qpack import MIMETYPE as QPACK_MIMETYPE
+from .question_bank import (AFTER_SEQ, negotiate_encoding, negotiate_format, question_bank, question_bank_etag,
+                            question_changes)
+
+bp = Blueprint('quiz', __name__)
+
+
+def requested_subjects():
+    """
+    Returns the subjects selected through repeated ?subject= query parameters.
+    An empty list means no filtering ('All' or nothing selected).
+    """
+    subjects = [s.strip() for s in request.args.getlist('subject') if s.strip()]
+    if 'All' in subjects:
+        return []
+    return subjects
+
+
+@bp.route('/quiz')
+def quiz():
+    """
+    Displays the quiz page for logged-in users. The page is a shell with no questions in it: the
+    client loads them from /api/questions (or resumes a saved attempt), so starting a quiz reads
+    the bank once, and the same page can be cached for every subject selection.
+    """
+    if 'username' not in session or session['username'] == 'admin':
+        return redirect(url_for('auth.login'))
+
+    return render_template('quiz.html', username=session['username'])
+
+@bp.route('/sw.js')
+def service_worker():
+    """Serves the service worker from the site root, the only place it may control /quiz from."""
+    response = send_from_directory(os.path.join(current_app.static_folder, 'js'), 'sw.js', max_age=0)
+    response.headers['Cache-Control'] = 'no-cache' # Browsers must pick up new versions promptly
+    return response
+
+@bp.route('/api/questions')
+def api_questions():
+    """
+    Provides quiz questions as a keyset-paginated JSON API endpoint.
+
+    Query parameters:
+      subject  - filter by subject, may be repeated (omitted or 'All' means every subject)
+      after_id - cursor from the previous page's 'next_after_id'
+      limit    - page size, capped at QUESTIONS_MAX_PAGE_SIZE
+      count    - if set, only the number of matching questions is returned
+
+    Pages are JSON, or qpack (see quiz_app/qpack.py) for clients that prefer it in Accept.
+    """
+    if 'username' not in session or session['username'] == 'admin':
+        return jsonify({'questions': [], 'next_after_id': None})
+
+    subjects = requested_subjects()
+    if request.args.get('count'):
+        return jsonify({'count': question_bank.count(subjects)})
+
+    after_id = request.args.get('after_id', 0, type=int)
+    limit = request.args.get('limit', current_app.config['QUESTIONS_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['QUESTIONS_MAX_PAGE_SIZE']))
+
+    # Pages are assembled from pre-encoded question snapshots and kept precompressed,
+    # so a cache hit costs one version lookup and no ORM or compression work.
+    versions = question_bank.versions(subjects)
+    etag = question_bank_etag(versions, after_id, limit)
+    encoding = negotiate_encoding()
+    # Clients sending `Accept: application/vnd.jee-quiz.qpack` get the compact binary format.
+    fmt = negotiate_format()
+    # Every format and content-coding of the same page gets its own strong ETag.
+    format_etag = etag if fmt == 'json' else f'{etag}-{fmt}'
+    variant_etag = format_etag if encoding == 'identity' else f'{format_etag}-{encoding}'
+    cached_etags = [format_etag, f'{format_etag}-gzip', f'{format_etag}-br']
+
+    if any(request.if_none_match.contains(tag) for tag in cached_etags):
+        response = current_app.response_class(status=304)
+    else:
+        body = question_bank.page_body(versions, after_id, limit, encoding, fmt)
+        response = current_app.response_class(body, mimetype=QPACK_MIMETYPE if fmt == 'qpack' else 'application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(variant_etag)
+    response.headers['Vary'] = 'Accept, Accept-Encoding, Cookie'
+    # Clients must revalidate, which is cheap thanks to the ETag.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@bp.route('/api/questions/changes')
+def question_changes_api():
+    """
+    Returns what changed in the question bank since a client last synced, so clients holding
+    a copy of the bank download only the questions added, edited or removed since then.
+
+    Query parameters:
+      since   - 'seq' of the client's last complete sync (0 for everything)
+      cursor  - 'cursor' of the previous response, while one sync spans several pages
+      subject - filter by subject, may be repeated (omitted or 'All' means every subject)
+      limit   - changes per page, capped at QUESTIONS_MAX_PAGE_SIZE
+
+    Responds with {"removed": [ids], "questions": [...], "seq": ..., "cursor": ...}. Clients apply
+    'removed' before 'questions' (a question moved to another subject appears in both), follow
+    'cursor' until it is null and then keep 'seq' as their next 'since'.
+    """
+    if 'username' not in session or session['username'] == 'admin':
+        return jsonify({'removed': [], 'questions': [], 'seq': 0, 'cursor': None})
+
+    subjects = requested_subjects()
+    limit = request.args.get('limit', current_app.config['QUESTIONS_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['QUESTIONS_MAX_PAGE_SIZE']))
+    if request.args.get('cursor'):
+        # upper-seq-kind-id: the sync keeps the upper bound it started with
+        try:
+            upper, *cursor = (int(part) for part in request.args['cursor'].split('-'))
+        except ValueError:
+            upper, cursor = None, None
+        if upper is None or len(cursor) != 3:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        # Read before the changes: everything numbered up to it is committed, later changes wait
+        # for the next sync instead of being half seen.
+        upper = current_change_seq()
+        cursor = [request.args.get('since', 0, type=int), AFTER_SEQ, 0]
+
+    etag = 'qc-' + hashlib.sha1(repr((sorted(subjects), upper, cursor, limit)).encode()).hexdigest()[:20]
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        removed, questions, next_cursor = question_changes(subjects, tuple(cursor), upper, limit)
+        response = jsonify({
+            'removed': removed,
+            'questions': questions,
+            'seq': upper,
+            'cursor': '-'.join(str(part) for part in (upper, *next_cursor)) if next_cursor else None
+        })
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Cookie'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@bp.route('/api/attempts', methods=['POST'])
+def start_attempt():
+    """
+    Starts a new attempt for the logged-in user over the given subjects (JSON: {"subjects": [...]}).
+    With a "paper" object (see parse_paper_spec) the attempt gets a generated paper instead of every
+    question in its subjects; its questions, with options in paper order, are part of the response.
+    """
+    user = current_user()
+    if user is None:
+        return jsonify({'error': 'Login required'}), 401
+
+    payload = request.get_json(silent=True)
+    if payload is None:
+        payload = {}
+    if not isinstance(payload, dict) or not isinstance(payload.get('subjects', []), list) \
+            or not all(isinstance(s, str) for s in payload.get('subjects', [])):
+        return jsonify({'error': "Expected a JSON object whose 'subjects' is a list of strings."}), 400
+    subjects = [s for s in payload.get('subjects', []) if s.strip() and s != 'All']
+    attempt = Attempt(user_id=user.id, subjects=json.dumps(subjects))
+    paper = None
+    if payload.get('paper') is not None:
+        spec, error = parse_paper_spec(payload['paper'])
+        if error:
+            return jsonify({'error': error}), 400
+        attempt.seed = new_paper_seed()
+        paper = generate_paper(subjects, spec, attempt.seed)
+        attempt.paper = json.dumps(paper, separators=(',', ':'))
+    db.session.add(attempt)
+    db.session.commit()
+
+    body = {
+        'id': attempt.id,
+        'time_limit_seconds': current_app.config['QUIZ_DURATION_SECONDS']
+    }
+    if paper is not None:
+        body['seed'] = attempt.seed
+        body['questions'] = paper_questions(paper)
+    return jsonify(body), 201
+
+@bp.route('/api/attempts/<int:attempt_id>/paper')
+def attempt_paper(attempt_id):
+    """Returns the questions of an attempt's generated paper, e.g. after a page reload."""
+    attempt = get_user_attempt(attempt_id)
+    if attempt is None or attempt.paper is None:
+        return jsonify({'error': 'Attempt not found'}), 404
+    return jsonify({'id': attempt.id, 'seed': attempt.seed, 'questions': paper_questions(json.loads(attempt.paper))})
+
+@bp.route('/api/attempts/<int:attempt_id>/answers', methods=['POST'])
+def save_attempt_answers(attempt_id):
+    """
+    Saves a batch of answer deltas for an attempt: {"answers": [{"question_id", "selected", "marked"}, ...]}.
+    Answers arriving after the time limit (plus a short grace period) submit the attempt instead.
+    """
+    attempt = get_user_attempt(attempt_id)
+    if attempt is None:
+        return jsonify({'error': 'Attempt not found'}), 404
+    if attempt.submitted_at is not None:
+        return jsonify({'error': 'Attempt already submitted'}), 409
+    if utcnow() > attempt.deadline + timedelta(seconds=current_app.config['QUIZ_GRACE_SECONDS']):
+        save_answers(attempt.id, answer_buffer.take(attempt.id))
+        score_attempt(attempt)
+        return jsonify({'error': 'Time is up; the attempt has been submitted'}), 409
+
+    rows, error = parse_answer_deltas(request.get_json(silent=True))
+    if error:
+        return jsonify({'error': error}), 400
+    rows = to_bank_answers(attempt, rows)
+    answer_buffer.add(attempt.id, rows)
+    return jsonify({'saved': len(rows)})
+
+@bp.route('/api/attempts/<int:attempt_id>/submit', methods=['POST'])
+def submit_attempt(attempt_id):
+    """Submits an attempt (optionally with final answer deltas in the body) and returns its score."""
+    attempt = get_user_attempt(attempt_id)
+    if attempt is None:
+        return jsonify({'error': 'Attempt not found'}), 404
+
+    if attempt.submitted_at is None:
+        rows = []
+        payload = request.get_json(silent=True)
+        if payload:
+            rows, error = parse_answer_deltas(payload)
+            if error:
+                return jsonify({'error': error}), 400
+            rows = to_bank_answers(attempt, rows)
+        # Buffered answers and the final deltas are written in the same transaction as the score
+        save_answers(attempt.id, answer_buffer.take(attempt.id))
+        save_answers(attempt.id, rows)
+        score_attempt(attempt)
+    return jsonify({'id': attempt.id, 'score': attempt.score, 'total': attempt.total})
+
+@bp.route('/results')
+def results():
+    """Displays the quiz results page for a submitted attempt (?attempt=<id>)."""
+    if 'username' not in session:
+        return redirect(url_for('auth.login'))
+    attempt = get_user_attempt(request.args.get('attempt', type=int))
+    if attempt is not None and attempt.submitted_at is None:
+        attempt = None
+    return render_template('results.html', username=session['username'], attempt=attempt)
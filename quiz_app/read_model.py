@@ -0,0 +1,47 @@
+"""
+Read model of the question bank: the columns clients see, selected as plain tuples through
+SQLAlchemy Core and streamed in batches.
+
+Serving paths never build Question instances, so a read costs no identity map entries or
+attribute instrumentation per row, and the answer key is never loaded.
+"""
+from flask import current_app
+
+from .extensions import db
+from .models import Question
+
+# Every read-model row starts with these columns, in this order; queries may append more.
+COLUMNS = (Question.id, Question.question_text, Question.option1, Question.option2,
+           Question.option3, Question.option4, Question.subject)
+
+
+def select_questions(*extra_columns):
+    """Core SELECT of COLUMNS followed by extra_columns; add filters and ordering as usual."""
+    return db.select(*COLUMNS, *extra_columns)
+
+
+def question_row(values):
+    """A tuple of the COLUMNS values in the shape served by /api/questions."""
+    question_id, text, option1, option2, option3, option4, subject = values
+    return {
+        'id': question_id,
+        'q': text,
+        'options': [option1, option2, option3, option4],
+        'subject': subject # The answer key stays on the server; attempts are scored there
+    }
+
+
+def iter_tuples(query):
+    """
+    Yields the rows of a read-model query as tuples, fetched QUESTION_READ_BATCH rows at a
+    time (yield_per), so the full result is never held in memory at once.
+    """
+    result = db.session.execute(query.execution_options(yield_per=current_app.config['QUESTION_READ_BATCH']))
+    for partition in result.tuples().partitions():
+        yield from partition
+
+
+def iter_question_rows(query):
+    """Yields the rows of a read-model query in the shape served by /api/questions."""
+    for values in iter_tuples(query):
+        yield question_row(values)
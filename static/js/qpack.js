@@ -0,0 +1,69 @@
+// Decoder for qpack, the compact binary /api/questions format (layout in quiz_app/qpack.py).
+// Request it with `Accept: application/vnd.jee-quiz.qpack`; decodeQuestionPack() returns the
+// same {questions, next_after_id} object as the JSON response.
+const QPACK_MIMETYPE = 'application/vnd.jee-quiz.qpack';
+
+function decodeQuestionPack(buffer) {
+  const bytes = new Uint8Array(buffer);
+  let pos = 0;
+
+  function varint() {
+    let value = 0;
+    let scale = 1;
+    let byte;
+    do {
+      byte = bytes[pos++];
+      value += (byte & 0x7f) * scale; // Multiplication keeps ids above 2^31 exact
+      scale *= 128;
+    } while (byte & 0x80);
+    return value;
+  }
+
+  if (String.fromCharCode(bytes[0], bytes[1], bytes[2], bytes[3]) !== 'QPK1') {
+    throw new Error('Not a qpack payload');
+  }
+  pos = 4;
+  const next = varint();
+  const decoder = new TextDecoder();
+
+  const subjects = [null];
+  for (let count = varint(); count > 0; count--) {
+    const length = varint();
+    subjects.push(decoder.decode(bytes.subarray(pos, pos + length)));
+    pos += length;
+  }
+
+  // The string table is one UTF-8 blob decoded in a single call, then sliced by UTF-16 length.
+  const lengths = new Array(varint());
+  for (let i = 0; i < lengths.length; i++) {
+    lengths[i] = varint();
+  }
+  const blobLength = varint();
+  const blob = decoder.decode(bytes.subarray(pos, pos + blobLength));
+  pos += blobLength;
+  const strings = new Array(lengths.length);
+  for (let i = 0, offset = 0; i < lengths.length; i++) {
+    strings[i] = blob.substr(offset, lengths[i]);
+    offset += lengths[i];
+  }
+
+  let unused = 0; // Next string of the table not referenced yet
+  function string() {
+    const ref = varint();
+    return ref === 0 ? strings[unused++] : strings[ref - 1];
+  }
+
+  const questions = new Array(varint());
+  for (let i = 0, id = 0; i < questions.length; i++) {
+    id += varint();
+    const subject = subjects[varint()];
+    const q = string();
+    const options = [string(), string(), string(), string()];
+    questions[i] = { id, q, options, subject };
+  }
+  return { questions, next_after_id: next === 0 ? null : next - 1 };
+}
+
+if (typeof module !== 'undefined') {
+  module.exports = { QPACK_MIMETYPE, decodeQuestionPack }; // Node, for benchmarks/bench_payload.py
+}
@@ -0,0 +1,53 @@
+// IndexedDB copy of the attempt in progress, so a reload or a dropped connection loses neither
+// the paper nor the answers. Two records per quiz page (key: user and page URL):
+//   papers   - { key, attemptId, questions, deadline }, written once when the attempt starts
+//   progress - { key, states, pending, submitting }, rewritten on every answer (it is small)
+// pending holds the answer deltas not yet acknowledged by the server.
+const QuizStore = (() => {
+  const DB_NAME = 'jee-quiz';
+  const STORES = ['papers', 'progress'];
+  let dbPromise = null;
+
+  function open() {
+    if (dbPromise === null) {
+      dbPromise = new Promise((resolve, reject) => {
+        const request = indexedDB.open(DB_NAME, 1);
+        request.onupgradeneeded = () => {
+          STORES.forEach(name => request.result.createObjectStore(name, { keyPath: 'key' }));
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+      });
+    }
+    return dbPromise;
+  }
+
+  // Runs action(stores) in one transaction and resolves once it has committed.
+  async function transaction(mode, action) {
+    const db = await open();
+    return new Promise((resolve, reject) => {
+      const tx = db.transaction(STORES, mode);
+      const stores = { papers: tx.objectStore('papers'), progress: tx.objectStore('progress') };
+      const requests = action(stores);
+      tx.oncomplete = () => resolve(requests.map(request => request.result));
+      tx.onerror = () => reject(tx.error);
+      tx.onabort = () => reject(tx.error);
+    });
+  }
+
+  return {
+    available: typeof indexedDB !== 'undefined',
+
+    // Resolves to { paper, progress } for the quiz page, or null if nothing is stored.
+    async load(key) {
+      const [paper, progress] = await transaction('readonly', s => [s.papers.get(key), s.progress.get(key)]);
+      return paper && progress ? { paper, progress } : null;
+    },
+
+    savePaper: paper => transaction('readwrite', s => [s.papers.put(paper)]),
+
+    saveProgress: progress => transaction('readwrite', s => [s.progress.put(progress)]),
+
+    remove: key => transaction('readwrite', s => [s.papers.delete(key), s.progress.delete(key)]),
+  };
+})();
@@ -0,0 +1,65 @@
+// Service worker (served as /sw.js so it controls /quiz): keeps the quiz page and its scripts and
+// styles available without a network. Scripts and styles come from the cache and are refreshed in
+// the background; the quiz page is fetched from the network first and falls back to the cached copy.
+// API calls pass straight through: the page keeps its paper and unsent answers in IndexedDB
+// (static/js/quiz_store.js) and resumes from there.
+const CACHE = 'jee-quiz-v1'; // Bump to drop the old cache when the assets below change
+const ASSETS = ['/static/css/style.css', '/static/js/qpack.js', '/static/js/quiz_store.js'];
+
+self.addEventListener('install', event => {
+  event.waitUntil(caches.open(CACHE).then(cache => cache.addAll(ASSETS)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil(caches.keys()
+    .then(names => Promise.all(names.filter(name => name !== CACHE).map(name => caches.delete(name))))
+    .then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) {
+    return;
+  }
+  if (url.pathname.startsWith('/static/css/') || url.pathname.startsWith('/static/js/')) {
+    event.respondWith(staleWhileRevalidate(event, request));
+  } else if (request.mode === 'navigate' && url.pathname === '/quiz') {
+    event.respondWith(networkFirst(request));
+  }
+});
+
+async function staleWhileRevalidate(event, request) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(request);
+  const refresh = fetch(request).then(response => {
+    if (response.ok) {
+      cache.put(request, response.clone());
+    }
+    return response;
+  });
+  if (cached) {
+    event.waitUntil(refresh.catch(() => {}));
+    return cached;
+  }
+  return refresh;
+}
+
+async function networkFirst(request) {
+  const cache = await caches.open(CACHE);
+  try {
+    const response = await fetch(request);
+    // A redirect means the session is gone (login page); that is not the quiz page to keep.
+    if (response.ok && !response.redirected) {
+      cache.put(request, response.clone());
+    }
+    return response;
+  } catch (err) {
+    // The page is the same for every subject selection, so any cached copy will do.
+    const cached = await cache.match(request) || await cache.match(request, { ignoreSearch: true });
+    if (cached) {
+      return cached;
+    }
+    throw err;
+  }
+}
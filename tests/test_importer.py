@@ -0,0 +1,67 @@
+"""Regression checks for question imports (quiz_app/importer.py)."""
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_migrate import upgrade
+from quiz_app import create_app, init_migrations
+from quiz_app.extensions import db
+from quiz_app.importer import import_questions
+from quiz_app.models import Question
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'bank.db'),
+                      'QUESTION_INSERT_BATCH_SIZE': 2})
+    init_migrations(app)
+    with app.app_context():
+        upgrade()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def run_import(text, fmt='csv', duplicates='update'):
+    result = import_questions(io.BytesIO(text.encode('utf-8')), fmt, duplicates=duplicates)
+    db.session.commit()
+    return result
+
+
+def stored(question_text):
+    q = Question.query.filter_by(question_text=question_text).one()
+    return q.correct_answer, q.difficulty, q.topic
+
+
+def test_update_keeps_difficulty_and_topic_the_file_leaves_out(app):
+    run_import('question,option1,option2,option3,option4,answer,subject,difficulty,topic\n'
+               'Q1,a,b,c,d,A,Physics,hard,Optics\n'
+               'Q2,a,b,c,d,A,Physics,easy,Waves\n'
+               'Q3,a,b,c,d,A,Physics,medium,Heat\n')
+
+    # No difficulty/topic columns at all: only the answer keys change
+    result = run_import('question,option1,option2,option3,option4,answer,subject\n'
+                        'Q1,a,b,c,d,B,Physics\n'
+                        'Q2,a,b,c,d,C,Physics\n')
+    assert result.updated == 2
+    assert stored('Q1') == (1, 3, 'Optics')
+    assert stored('Q2') == (2, 1, 'Waves')
+
+
+def test_update_with_mixed_rows_in_one_batch(app):
+    run_import('question,option1,option2,option3,option4,answer,subject,difficulty,topic\n'
+               'Q1,a,b,c,d,A,Physics,hard,Optics\n'
+               'Q2,a,b,c,d,A,Physics,easy,Waves\n')
+
+    # Empty cells keep the stored value; given cells overwrite it, within the same batch
+    run_import('{"question": "Q1", "options": ["a", "b", "c", "d"], "answer": "D", "subject": "Physics", "difficulty": 2}\n'
+               '{"question": "Q2", "options": ["a", "b", "c", "d"], "answer": "B", "subject": "Physics", "topic": ""}\n'
+               '{"question": "Q9", "options": ["a", "b", "c", "d"], "answer": "A", "subject": "Physics"}\n',
+               fmt='jsonl')
+    assert stored('Q1') == (3, 2, 'Optics')
+    assert stored('Q2') == (1, 1, 'Waves')
+    assert stored('Q9') == (0, None, None)
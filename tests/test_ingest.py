@@ -0,0 +1,85 @@
+"""Regression checks for PDF ingestion (quiz_app/ingest.py)."""
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_migrate import upgrade
+from quiz_app import create_app, ingest, init_migrations
+from quiz_app.extensions import db
+from quiz_app.models import Question, QuestionTombstone, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'bank.db'),
+                      'QUESTION_INSERT_BATCH_SIZE': 2,
+                      'PARSE_CACHE_FOLDER': str(tmp_path / 'parse_cache'),
+                      # Writers give up quickly, so a held write lock fails the test instead of slowing it
+                      'SQLITE_PRAGMAS': {'journal_mode': 'WAL', 'busy_timeout': 200}})
+    init_migrations(app)
+    with app.app_context():
+        upgrade()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def page(first, count):
+    return ''.join(f'\n{n}. Question {n}?\nA. a{n}\nB. b{n}\nC. c{n}\nD. d{n}\n' for n in range(first, first + count))
+
+
+def test_writes_succeed_while_a_slow_job_extracts(app, tmp_path, monkeypatch):
+    extracting, release = threading.Event(), threading.Event()
+
+    def slow_pages(filepath):
+        yield page(1, 5) # More than one insert batch, before extraction stalls
+        extracting.set()
+        release.wait(10)
+        yield page(6, 5)
+
+    monkeypatch.setattr(ingest, 'iter_pdf_pages', slow_pages)
+    filepath = tmp_path / 'paper.pdf'
+    filepath.write_bytes(b'%PDF-1.4 slow paper')
+    db.session.add(User(username='student', password='x'))
+    db.session.commit()
+
+    job = ingest.submit_ingest_job(str(filepath), 'Physics')
+    try:
+        assert extracting.wait(10)
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['username'] = 'student'
+        response = client.post('/api/attempts', json={'subjects': ['Physics']})
+        assert response.status_code == 201, response.get_data(as_text=True)
+    finally:
+        release.set()
+
+    deadline = time.time() + 10
+    while job.status not in ('done', 'failed') and time.time() < deadline:
+        time.sleep(0.05)
+    assert job.status == 'done', job.error
+    assert job.questions_inserted == 10
+    db.session.remove()
+    assert Question.query.filter_by(subject='Physics').count() == 10
+
+
+def test_reimport_under_another_subject_moves_questions(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, 'iter_pdf_pages', lambda filepath: [page(1, 3)])
+    filepath = tmp_path / 'paper.pdf'
+    filepath.write_bytes(b'%PDF-1.4 paper')
+    ingest.ingest_pdf(str(filepath), 'Physics')
+    Question.query.filter_by(question_text='Question 1?').one().correct_answer = 2
+    db.session.commit()
+
+    # Read back from the parse cache: nothing new, every question moves and keeps its answer key
+    result = ingest.ingest_pdf(str(filepath), 'Chemistry')
+    assert (result.inserted, result.duplicates) == (0, 3)
+    assert sorted((q.subject, q.correct_answer) for q in Question.query) == [
+        ('Chemistry', -1), ('Chemistry', -1), ('Chemistry', 2)]
+    # Clients syncing Physics see them removed
+    assert [t.subject for t in QuestionTombstone.query] == ['Physics'] * 3